@@ -1,14 +1,17 @@
 import logging
 import jsonpickle
-from collections import defaultdict
+import numpy as np
+from collections import defaultdict, Counter
+from operator import itemgetter
 from emmaa.model import load_stmts_from_s3
 from emmaa.statements import filter_emmaa_stmts_by_metadata, \
     filter_indra_stmts_by_metadata
 from emmaa.model_tests import load_model_manager_from_s3
-from emmaa.util import find_latest_s3_file, find_nth_latest_s3_file, \
-    strip_out_date, EMMAA_BUCKET_NAME, load_json_from_s3, save_json_to_s3, \
-    _make_delta_msg
+from emmaa.util import find_latest_s3_file, sort_s3_files_by_date_str, \
+    strip_out_date, EMMAA_BUCKET_NAME, load_json_from_s3_cached, \
+    save_json_to_s3, _make_delta_msg
 from indra.statements.statements import Statement
+from indra.explanation.model_checker import PathResult, PathMetric
 from indra.assemblers.english.assembler import EnglishAssembler
 from indra.literature import pubmed_client, crossref_client, pmc_client
 from indra_db import get_db
@@ -28,6 +31,11 @@ CONTENT_TYPE_FUNCTION_MAPPING = {
     'assembled_papers': 'get_all_assembled_paper_ids'}
 
 
+# Classes found in the flattened test results, registered with the unpickler
+# so that they are not imported by name for every restored object
+RESULT_CLASSES = [PathResult, PathMetric]
+
+
 class Round(object):
     """Parent class for classes analyzing one round of something (model or
     tests).
@@ -41,15 +49,19 @@ class Round(object):
     ----------
 
     function_mapping : dict
-        A dictionary of strings mapping a type of content to a tuple of
-        functions necessary to find delta for this type of content. First
-        function in a tuple gets a list of all hashes for a given content type,
-        while the second returns an English description of a given content type
-        for a single hash.
+        A dictionary mapping a type of content to a bound method of this round
+        returning a list of all hashes for this type of content. It is used to
+        find delta for this type of content and only includes the content
+        types supported by this round.
     """
     def __init__(self, date_str):
         self.date_str = date_str
-        self.function_mapping = CONTENT_TYPE_FUNCTION_MAPPING
+        # Resolve the method names once instead of on every delta lookup
+        self.function_mapping = {
+            content_type: getattr(self, function_name)
+            for content_type, function_name in
+            CONTENT_TYPE_FUNCTION_MAPPING.items()
+            if hasattr(self, function_name)}
 
     @classmethod
     def load_from_s3_key(cls, key):
@@ -84,16 +96,18 @@ class Round(object):
             given content type between two test rounds.
         """
         logger.info(f'Finding a hashes delta for {content_type}.')
-        latest_hashes = getattr(
-            self, self.function_mapping[content_type])(**kwargs)
+        latest_hashes = self.function_mapping[content_type](**kwargs)
         logger.info(f'Found {len(latest_hashes)} hashes in current round.')
-        previous_hashes = getattr(
-            other_round,
-            other_round.function_mapping[content_type])(**kwargs)
+        previous_hashes = other_round.function_mapping[content_type](**kwargs)
         logger.info(f'Found {len(previous_hashes)} hashes in other round.')
+        # Nothing changed between the rounds, no need to build the sets
+        if latest_hashes == previous_hashes:
+            return {'added': [], 'removed': []}
         # Find hashes unique for each of the rounds - this is delta
-        added_hashes = list(set(latest_hashes) - set(previous_hashes))
-        removed_hashes = list(set(previous_hashes) - set(latest_hashes))
+        latest_hashes = set(latest_hashes)
+        previous_hashes = set(previous_hashes)
+        added_hashes = list(latest_hashes - previous_hashes)
+        removed_hashes = list(previous_hashes - latest_hashes)
         hashes = {'added': added_hashes, 'removed': removed_hashes}
         return hashes
 
@@ -114,6 +128,9 @@ class ModelRound(Round):
 
     Attributes
     ----------
+    stmts_by_hash : dict
+        A dictionary mapping the string hashes of assembled statements to the
+        statements themselves.
     stmts_by_papers : dict
         A dictionary mapping the paper IDs to sets of hashes of assembled
         statements with evidences retrieved from these papers.
@@ -125,6 +142,10 @@ class ModelRound(Round):
         self.paper_ids = paper_ids if paper_ids else []
         self.paper_id_type = paper_id_type
         self.emmaa_statements = emmaa_statements if emmaa_statements else []
+        # Hashes are refreshed once here and reused by all summary methods
+        self.stmts_by_hash = {str(stmt.get_hash(refresh=True)): stmt
+                              for stmt in self.statements}
+        self._english_stmts_by_hash = None
         self.stmts_by_papers = self.get_assembled_stmts_by_paper(paper_id_type)
 
     @classmethod
@@ -160,54 +181,54 @@ class ModelRound(Round):
 
     def get_stmt_hashes(self):
         """Return a list of hashes for all statements in a model."""
-        return [str(stmt.get_hash(refresh=True)) for stmt in self.statements]
+        return list(self.stmts_by_hash.keys())
 
     def get_statement_types(self):
         """Return a sorted list of tuples containing a statement type and a
         number of times a statement of this type occured in a model.
         """
-        statement_types = defaultdict(int)
         logger.info('Finding a distribution of statements types.')
-        for stmt in self.statements:
-            statement_types[type(stmt).__name__] += 1
-        return sorted(statement_types.items(), key=lambda x: x[1], reverse=True)
+        statement_types = Counter(
+            type(stmt).__name__ for stmt in self.statements)
+        return statement_types.most_common()
 
     def get_agent_distribution(self):
         """Return a sorted list of tuples containing an agent name and a number
         of times this agent occured in statements of a model."""
         logger.info('Finding agent distribution among model statements.')
-        agent_count = defaultdict(int)
-        for stmt in self.statements:
-            for agent in stmt.agent_list():
-                if agent is not None:
-                    agent_count[agent.name] += 1
-        return sorted(agent_count.items(), key=lambda x: x[1], reverse=True)
+        agent_count = Counter(
+            agent.name for stmt in self.statements
+            for agent in stmt.agent_list() if agent is not None)
+        return agent_count.most_common()
 
     def get_statements_by_evidence(self):
         """Return a sorted list of tuples containing a statement hash and a
         number of times this statement occured in a model."""
-        stmts_evidence = {}
-        for stmt in self.statements:
-            stmts_evidence[str(stmt.get_hash(refresh=True))] = len(stmt.evidence)
+        hashes = np.array(list(self.stmts_by_hash.keys()))
+        counts = np.fromiter(
+            (len(stmt.evidence) for stmt in self.stmts_by_hash.values()),
+            dtype=np.int64, count=len(self.stmts_by_hash))
         logger.info('Sorting statements by evidence count.')
-        return sorted(stmts_evidence.items(), key=lambda x: x[1], reverse=True)
+        # A stable sort on negated counts keeps the original order of
+        # statements with the same number of evidences
+        order = np.argsort(-counts, kind='stable')
+        return list(zip(hashes[order].tolist(), counts[order].tolist()))
 
     def get_english_statements_by_hash(self):
         """Return a dictionary mapping a statement and its English description."""
-        stmts_by_hash = {}
-        for stmt in self.statements:
-            stmts_by_hash[str(stmt.get_hash(refresh=True))] = (
-                self.get_english_statement(stmt))
-        return stmts_by_hash
+        if self._english_stmts_by_hash is None:
+            stmts_by_hash = {}
+            for stmt_hash, stmt in self.stmts_by_hash.items():
+                stmts_by_hash[stmt_hash] = self.get_english_statement(stmt)
+            self._english_stmts_by_hash = stmts_by_hash
+        return self._english_stmts_by_hash
 
     def get_sources_distribution(self):
         logger.info('Finding distribution of sources of statement evidences.')
-        sources_count = defaultdict(int)
-        for stmt in self.statements:
-            for evid in stmt.evidence:
-                if evid.source_api:
-                    sources_count[evid.source_api] += 1
-        return sorted(sources_count.items(), key=lambda x: x[1], reverse=True)
+        sources_count = Counter(
+            evid.source_api for stmt in self.statements
+            for evid in stmt.evidence if evid.source_api)
+        return sources_count.most_common()
 
     def get_all_raw_paper_ids(self):
         """Return all paper IDs used in this round."""
@@ -252,7 +273,7 @@ class ModelRound(Round):
         logger.info('Finding paper distribution')
         paper_stmt_count = {paper_id: len(stmts) for (paper_id, stmts) in
                             self.stmts_by_papers.items()}
-        return sorted(paper_stmt_count.items(), key=lambda x: x[1],
+        return sorted(paper_stmt_count.items(), key=itemgetter(1),
                       reverse=True)
 
     def get_raw_paper_counts(self):
@@ -393,11 +414,11 @@ class ModelRound(Round):
 
         cur_stats = {
             'curators_ev_counts': sorted(
-                curators_ev_counts.items(), key=lambda x: x[1], reverse=True),
+                curators_ev_counts.items(), key=itemgetter(1), reverse=True),
             'curators_stmt_counts': sorted(
-                curators_stmt_counts.items(), key=lambda x: x[1], reverse=True),
+                curators_stmt_counts.items(), key=itemgetter(1), reverse=True),
             'curs_by_tags': sorted(
-                curs_by_tags.items(), key=lambda x: x[1], reverse=True),
+                curs_by_tags.items(), key=itemgetter(1), reverse=True),
             'cur_ev_dates': cur_ev_date_sum,
             'cur_stmt_dates': cur_stmt_date_sum
         }
@@ -419,9 +440,12 @@ class TestRound(Round):
 
     Attributes
     ----------
+    mc_types : list[str]
+        A list of ModelChecker types the tests were run with.
     mc_types_results : dict
         A dictionary mapping a type of a ModelChecker to a list of test
-        results generated by this ModelChecker
+        results generated by this ModelChecker. The results are only
+        deserialized from JSON the first time this attribute is accessed.
     tests : list[indra.statements.Statement]
         A list of INDRA Statements used to make EMMAA tests.
     english_test_results : dict
@@ -432,28 +456,35 @@ class TestRound(Round):
     def __init__(self, json_results, date_str):
         super().__init__(date_str)
         self.json_results = json_results
-        mc_types = self.json_results[0].get('mc_types', ['pysb'])
-        self.mc_types_results = {}
-        for mc_type in mc_types:
-            self.mc_types_results[mc_type] = self._get_results(mc_type)
+        self.mc_types = self.json_results[0].get('mc_types', ['pysb'])
+        self._mc_types_results = None
         self.tests = self._get_tests()
+        self._passed_test_hashes = {}
         self.english_test_results = self._get_applied_tests_results()
 
     @classmethod
     def load_from_s3_key(cls, key, bucket=EMMAA_BUCKET_NAME):
         logger.info(f'Loading json from {key}')
-        json_results = load_json_from_s3(bucket, key)
+        json_results = load_json_from_s3_cached(bucket, key)
         date_str = json_results[0].get('date_str', strip_out_date(key))
         return cls(json_results, date_str)
 
+    @property
+    def mc_types_results(self):
+        if self._mc_types_results is None:
+            unpickler = jsonpickle.unpickler.Unpickler()
+            self._mc_types_results = {
+                mc_type: self._get_results(mc_type, unpickler)
+                for mc_type in self.mc_types}
+        return self._mc_types_results
+
     def get_applied_test_hashes(self):
         """Return a list of hashes for all applied tests."""
         return list(self.english_test_results.keys())
 
     def get_passed_test_hashes(self, mc_type='pysb'):
         """Return a list of hashes for passed tests."""
-        return [test_hash for test_hash in self.english_test_results.keys() if
-                self.english_test_results[test_hash][mc_type][0] == 'Pass']
+        return self._passed_test_hashes.get(mc_type, [])
 
     def get_total_applied_tests(self):
         """Return a number of all applied tests."""
@@ -477,16 +508,24 @@ class TestRound(Round):
     def _get_applied_tests_results(self):
         """Return a dictionary mapping a test hash and a list containing its
         English description, result in Pass/Fail form and either a path if it
-        was found or a result code if it was not."""
+        was found or a result code if it was not.
+
+        Hashes of passed tests per mc_type are collected in the same pass
+        and stored for get_passed_test_hashes."""
         tests_by_hash = {}
+        # Keep whether the latest result for each hash passed, in the order
+        # in which the hashes first appeared
+        passed_by_hash = {mc_type: {} for mc_type in self.mc_types}
         logger.info('Retrieving test hashes, english tests and test results.')
 
+        # The fields we need are read directly from the JSON of each result
+        # to avoid deserializing every PathResult with jsonpickle
         def get_pass_fail(res):
             # Here use result.path_found because we care if the path was found
             # and do not care about path length
-            if res.path_found:
+            if res.get('path_found'):
                 return 'Pass'
-            elif res.result_code == 'STATEMENT_TYPE_NOT_HANDLED':
+            elif res.get('result_code') == 'STATEMENT_TYPE_NOT_HANDLED':
                 return 'n_a'
             else:
                 return 'Fail'
@@ -495,7 +534,7 @@ class TestRound(Round):
             path_or_code = None
             # Here use result.paths because we care about actual path (i.e.
             # we can't get a path exceeding max path length)
-            if res.paths:
+            if res.get('paths'):
                 try:
                     path_or_code = (
                         self.json_results[ix+1][mc_type]['path_json'])
@@ -511,30 +550,41 @@ class TestRound(Round):
                     pass
             # Couldn't get either path or code description from json
             if not path_or_code:
-                path_or_code = res.result_code
+                path_or_code = res.get('result_code')
             return path_or_code
 
         for ix, test in enumerate(self.tests):
             test_hash = str(test.get_hash(refresh=True))
-            tests_by_hash[test_hash] = {
-                'test': self.get_english_statement(test)}
-            for mc_type in self.mc_types_results:
-                result = self.mc_types_results[mc_type][ix]
+            # Tests with the same hash share the same English description
+            if test_hash not in tests_by_hash:
+                tests_by_hash[test_hash] = {
+                    'test': self.get_english_statement(test)}
+            for mc_type in self.mc_types:
+                result = self.json_results[ix+1][mc_type]['result_json']
+                pass_fail = get_pass_fail(result)
                 tests_by_hash[test_hash][mc_type] = [
-                        get_pass_fail(result),
-                        get_path_or_code(ix, result, mc_type)]
+                        pass_fail, get_path_or_code(ix, result, mc_type)]
+                passed_by_hash[mc_type][test_hash] = (pass_fail == 'Pass')
+        for mc_type, passed in passed_by_hash.items():
+            self._passed_test_hashes[mc_type] = [
+                test_hash for test_hash, is_passed in passed.items()
+                if is_passed]
         return tests_by_hash
 
     def get_path_stmt_counts(self):
         path_stmt_counts = self.json_results[0].get('path_stmt_counts')
         if path_stmt_counts:
             return sorted(
-                path_stmt_counts.items(), key=lambda x: x[1], reverse=True)
+                path_stmt_counts.items(), key=itemgetter(1), reverse=True)
         return []
 
-    def _get_results(self, mc_type):
-        unpickler = jsonpickle.unpickler.Unpickler()
-        test_results = [unpickler.restore(result[mc_type]['result_json'])
+    def _get_results(self, mc_type, unpickler=None):
+        if unpickler is None:
+            unpickler = jsonpickle.unpickler.Unpickler()
+        # Each result was flattened separately so the unpickler state has to
+        # be reset between them, only the class registry is reused
+        test_results = [unpickler.restore(result[mc_type]['result_json'],
+                                          classes=RESULT_CLASSES)
                         for result in self.json_results[1:]]
         return test_results
 
@@ -595,18 +645,14 @@ class StatsGenerator(object):
         raise NotImplementedError("Method must be implemented in child class.")
 
     def get_dates(self):
-        if not self.previous_json_stats:
-            previous_dates = []
-        else:
-            previous_dates = (
-                self.previous_json_stats['changes_over_time']['dates'])
-        previous_dates.append(self.latest_round.date_str)
-        return previous_dates
+        previous_dates = self._get_previous_changes().get('dates', [])
+        return previous_dates + [self.latest_round.date_str]
 
     def save_to_s3_key(self, stats_key):
         if self.json_stats:
             logger.info(f'Uploading statistics to {stats_key}')
-            save_json_to_s3(self.json_stats, self.bucket, stats_key)
+            save_json_to_s3(self.json_stats, self.bucket, stats_key,
+                            compress=True)
 
     def save_to_s3(self):
         raise NotImplementedError("Method must be implemented in child class.")
@@ -620,6 +666,13 @@ class StatsGenerator(object):
     def _get_previous_json_stats(self):
         raise NotImplementedError("Method must be implemented in child class.")
 
+    def _get_previous_changes(self):
+        # This returns the changes of previous_json_stats itself, not a copy,
+        # so callers build new lists from it instead of appending to it
+        if not self.previous_json_stats:
+            return {}
+        return self.previous_json_stats['changes_over_time']
+
 
 class ModelStatsGenerator(StatsGenerator):
     """Generates statistic for a given model update round.
@@ -761,14 +814,8 @@ class ModelStatsGenerator(StatsGenerator):
     def get_over_time(self, section, metrics, mc_type='pysb'):
         logger.info(f'Getting changes over time in {metrics} '
                     f'for {self.model_name}.')
-        # First available stats
-        if not self.previous_json_stats:
-            previous_data = []
-        else:
-            previous_data = (
-                self.previous_json_stats['changes_over_time'].get(metrics, []))
-        previous_data.append(self.json_stats[section][metrics])
-        return previous_data
+        previous_data = self._get_previous_changes().get(metrics, [])
+        return previous_data + [self.json_stats[section][metrics]]
 
     def save_to_s3(self):
         date_str = self.latest_round.date_str
@@ -804,22 +851,25 @@ class ModelStatsGenerator(StatsGenerator):
         return mr
 
     def _get_previous_json_stats(self):
-        key = find_latest_s3_file(
+        # List the stats files once and pick the latest or second latest key
+        keys = sort_s3_files_by_date_str(
             self.bucket, f'model_stats/{self.model_name}/model_stats_', '.json')
         # This is the first time statistics is generated for this model
-        if key is None:
+        if not keys:
             logger.info(f'Could not find a key to the previous statistics ')
             return
+        key = keys[0]
         # If stats for this date exists, previous stats is the second latest
         if strip_out_date(key) == self.latest_round.date_str:
             logger.info(f'Statistics for latest round already exists')
-            key = find_nth_latest_s3_file(
-                1, self.bucket, f'model_stats/{self.model_name}/model_stats_',
-                '.json')
+            if len(keys) < 2:
+                logger.info('Could not find a key to the previous statistics')
+                return
+            key = keys[1]
         # Store the date string to find previous round with it
         self.previous_date_str = strip_out_date(key)
         logger.info(f'Loading earlier statistics from {key}')
-        previous_json_stats = load_json_from_s3(self.bucket, key)
+        previous_json_stats = load_json_from_s3_cached(self.bucket, key)
         return previous_json_stats
 
 
@@ -880,7 +930,7 @@ class TestStatsGenerator(StatsGenerator):
             'number_applied_tests': self.latest_round.get_total_applied_tests(),
             'all_test_results': self.latest_round.english_test_results,
             'path_stmt_counts': self.latest_round.get_path_stmt_counts()}
-        for mc_type in self.latest_round.mc_types_results:
+        for mc_type in self.latest_round.mc_types:
             self.json_stats['test_round_summary'][mc_type] = {
                 'number_passed_tests': (
                     self.latest_round.get_number_passed_tests(mc_type)),
@@ -908,9 +958,9 @@ class TestStatsGenerator(StatsGenerator):
             if msg:
                 logger.info(msg['message'])
 
-        for mc_type in self.latest_round.mc_types_results:
+        for mc_type in self.latest_round.mc_types:
             if not self.previous_round or mc_type not in \
-                    self.previous_round.mc_types_results:
+                    self.previous_round.mc_types:
                 tests_delta[mc_type] = {
                     'passed_hashes_delta': {'added': [], 'removed': []}}
             else:
@@ -932,7 +982,7 @@ class TestStatsGenerator(StatsGenerator):
             'number_applied_tests': self.get_over_time(
                 'test_round_summary', 'number_applied_tests'),
             'dates': self.get_dates()}
-        for mc_type in self.latest_round.mc_types_results:
+        for mc_type in self.latest_round.mc_types:
             self.json_stats['changes_over_time'][mc_type] = {
                 'number_passed_tests': self.get_over_time(
                     'test_round_summary', 'number_passed_tests', mc_type),
@@ -942,31 +992,17 @@ class TestStatsGenerator(StatsGenerator):
     def get_over_time(self, section, metrics, mc_type='pysb'):
         logger.info(f'Getting changes over time in {metrics} '
                     f'for {self.model_name}.')
+        previous_changes = self._get_previous_changes()
         # Not mc_type relevant data
         if metrics == 'number_applied_tests':
-            # First available stats
-            if not self.previous_json_stats:
-                previous_data = []
-            else:
-                previous_data = (
-                    self.previous_json_stats['changes_over_time'][metrics])
-            previous_data.append(self.json_stats[section][metrics])
-        # Mc_type relevant data
+            previous_data = previous_changes.get(metrics, [])
+            latest_data = self.json_stats[section][metrics]
+        # Mc_type relevant data, this mc_type might not be available in
+        # previous stats
         else:
-            # First available stats
-            if not self.previous_json_stats:
-                previous_data = []
-            else:
-                # This mc_type wasn't available in previous stats
-                if mc_type not in \
-                        self.previous_json_stats['changes_over_time']:
-                    previous_data = []
-                else:
-                    previous_data = (
-                        self.previous_json_stats[
-                            'changes_over_time'][mc_type][metrics])
-            previous_data.append(self.json_stats[section][mc_type][metrics])
-        return previous_data
+            previous_data = previous_changes.get(mc_type, {}).get(metrics, [])
+            latest_data = self.json_stats[section][mc_type][metrics]
+        return previous_data + [latest_data]
 
     def save_to_s3(self):
         date_str = self.latest_round.date_str
@@ -1002,24 +1038,26 @@ class TestStatsGenerator(StatsGenerator):
         return tr
 
     def _get_previous_json_stats(self):
-        key = find_latest_s3_file(
+        # List the stats files once and pick the latest or second latest key
+        keys = sort_s3_files_by_date_str(
             self.bucket,
             f'stats/{self.model_name}/test_stats_{self.test_corpus}_', '.json')
         # This is the first time statistics is generated for this model
-        if key is None:
+        if not keys:
             logger.info(f'Could not find a key to the previous statistics ')
             return
+        key = keys[0]
         # If stats for this date exists, previous stats is the second latest
         if strip_out_date(key) == self.latest_round.date_str:
             logger.info(f'Statistics for latest round already exists')
-            key = find_nth_latest_s3_file(
-                1, self.bucket,
-                f'stats/{self.model_name}/test_stats_{self.test_corpus}_',
-                '.json')
+            if len(keys) < 2:
+                logger.info('Could not find a key to the previous statistics')
+                return
+            key = keys[1]
         # Store the date string to find previous round with it
         self.previous_date_str = strip_out_date(key)
         logger.info(f'Loading earlier statistics from {key}')
-        previous_json_stats = load_json_from_s3(self.bucket, key)
+        previous_json_stats = load_json_from_s3_cached(self.bucket, key)
         return previous_json_stats
 
 
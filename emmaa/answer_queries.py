@@ -1,6 +1,9 @@
+import os
+import time
 import logging
-from datetime import datetime
+import threading
 from copy import deepcopy
+from collections import OrderedDict
 
 from emmaa.model_tests import load_model_manager_from_s3
 from emmaa.db import get_db
@@ -11,7 +14,16 @@ from emmaa.util import make_date_str, find_latest_s3_file, EMMAA_BUCKET_NAME, \
 logger = logging.getLogger(__name__)
 
 
-model_manager_cache = {}
+# Least recently used model managers are evicted once the cache holds more
+# than MODEL_MANAGER_CACHE_SIZE of them.
+model_manager_cache = OrderedDict()
+_model_manager_cache_lock = threading.Lock()
+MODEL_MANAGER_CACHE_SIZE = int(os.environ.get(
+    'EMMAA_MODEL_MANAGER_CACHE_SIZE', 50))
+# Maps model names to (time checked, latest model manager key on S3) so that
+# repeated cache hits within S3_FRESHNESS_TTL seconds skip the S3 listing.
+_s3_freshness_cache = {}
+S3_FRESHNESS_TTL = 60
 
 
 class QueryManager(object):
@@ -30,6 +42,7 @@ class QueryManager(object):
         if db is None:
             self.db = get_db('primary')
         self.model_managers = model_managers if model_managers else []
+        self._mm_by_name = {mm.model.name: mm for mm in self.model_managers}
 
     def answer_immediate_query(
             self, user_email, user_id, query, model_names, subscribe,
@@ -40,28 +53,31 @@ class QueryManager(object):
         # Retrieve query-model hashes
         query_hashes = [
             query.get_hash_with_model(model) for model in model_names]
+        hashes_by_model = dict(zip(model_names, query_hashes))
         # Store query in the database for future reference.
-        self.db.put_queries(user_email, user_id, query, model_names, subscribe)
+        self.db.put_queries(user_email, user_id, query, model_names, subscribe,
+                            query_hashes=hashes_by_model)
         # Check if the query has already been answered for any of given models
         # and retrieve the results from database.
-        saved_results = self.db.get_results_from_query(query, model_names)
+        saved_results = self.db.get_results_from_hashes(set(query_hashes))
         if not saved_results:
             saved_results = []
         checked_models = {res[0] for res in saved_results}
         # If the query was answered for all models before, return the hashes.
-        if checked_models == set(model_names):
+        if checked_models == hashes_by_model.keys():
             return {query_type: query_hashes}
         # Run queries mechanism for models for which result was not found.
-        new_results = []
-        new_date = datetime.now()
+        results_to_store = {}
         for model_name in model_names:
             if model_name not in checked_models:
-                results_to_store = []
                 mm = self.get_model_manager(model_name)
                 response_list = mm.answer_query(query, bucket=bucket)
-                for (mc_type, response, paths) in response_list:
-                    results_to_store.append((query, mc_type, response))
-                self.db.put_results(model_name, results_to_store)
+                results_to_store[model_name] = [
+                    (query, mc_type, response)
+                    for (mc_type, response, paths) in response_list]
+        # Store the results for all models in one transaction.
+        self.db.put_results_for_models(results_to_store,
+                                       query_hashes=hashes_by_model)
         return {query_type: query_hashes}
 
     def answer_registered_queries(self, model_name, bucket=EMMAA_BUCKET_NAME):
@@ -84,8 +100,6 @@ class QueryManager(object):
         # Only do the following steps if there are queries for this model
         if queries:
             results = model_manager.answer_queries(queries, bucket=bucket)
-            new_results = [(model_name, result[0], result[1], result[2], '')
-                           for result in results]
             self.db.put_results(model_name, results)
 
     def get_registered_queries(self, user_email, query_type='path_property'):
@@ -102,15 +116,14 @@ class QueryManager(object):
 
     def get_model_manager(self, model_name):
         # Try get model manager from class attributes or load from s3.
-        for mm in self.model_managers:
-            if mm.model.name == model_name:
-                return mm
-        return load_model_manager_from_cache(model_name)
+        return self._mm_by_name.get(model_name) or \
+            load_model_manager_from_cache(model_name)
 
 
 def format_results(results, query_type='path_property'):
     """Format db output to a standard json structure."""
     model_types = ['pysb', 'pybel', 'signed_graph', 'unsigned_graph']
+    is_path_query = query_type in ['path_property', 'open_search_query']
     formatted_results = {}
     for result in results:
         model = result[0]
@@ -121,9 +134,15 @@ def format_results(results, query_type='path_property'):
                 'query': query.to_english(),
                 'model': model,
                 'date': make_date_str(result[5])}
+            # Make sure all model types are there, results for supported
+            # model types overwrite these below
+            if is_path_query:
+                for mt in model_types:
+                    formatted_results[query_hash][mt] = [
+                        'n_a', 'Model type not supported']
         mc_type = result[2]
         response_json = result[3]
-        delta = result[4]
+        delta = set(result[4])
         response = []
         for k, v in response_json.items():
             if isinstance(v, str):
@@ -135,7 +154,7 @@ def format_results(results, query_type='path_property'):
                     response.append(new_v)
                 else:
                     response.append(v)
-        if query_type in ['path_property', 'open_search_query']:
+        if is_path_query:
             if mc_type == '' and \
                     response == 'Query is not applicable for this model':
                 for mt in model_types:
@@ -161,31 +180,47 @@ def format_results(results, query_type='path_property'):
                     formatted_results[query_hash]['result'] = ['Fail', expl]
                 formatted_results[query_hash]['image'] = (
                     response[0]['fig_path'])
-    if query_type in ['path_property', 'open_search_query']:
-        # Loop through the results again to make sure all model types are there
-        for qh in formatted_results:
-            for mt in model_types:
-                if mt not in formatted_results[qh]:
-                    formatted_results[qh][mt] = [
-                        'n_a', 'Model type not supported']
     return formatted_results
 
 
-def load_model_manager_from_cache(model_name, bucket=EMMAA_BUCKET_NAME):
-    model_manager = model_manager_cache.get(model_name)
-    if model_manager:
+def _find_latest_model_manager_key(model_name, bucket=EMMAA_BUCKET_NAME):
+    # Reuse the latest model manager key found on S3 within the last
+    # S3_FRESHNESS_TTL seconds instead of listing the bucket again.
+    with _model_manager_cache_lock:
+        checked_at, latest_on_s3 = _s3_freshness_cache.get(
+            model_name, (None, None))
+    if checked_at is None or \
+            time.monotonic() - checked_at >= S3_FRESHNESS_TTL:
         latest_on_s3 = find_latest_s3_file(
             bucket, f'results/{model_name}/model_manager_', '.pkl')
+        with _model_manager_cache_lock:
+            _s3_freshness_cache[model_name] = (time.monotonic(), latest_on_s3)
+    return latest_on_s3
+
+
+def load_model_manager_from_cache(model_name, bucket=EMMAA_BUCKET_NAME):
+    with _model_manager_cache_lock:
+        model_manager = model_manager_cache.get(model_name)
+        if model_manager:
+            model_manager_cache.move_to_end(model_name)
+    latest_on_s3 = _find_latest_model_manager_key(model_name, bucket)
+    if model_manager:
         cached_date = model_manager.date_str
         logger.info(f'Found model manager cached on {cached_date} and '
                     f'latest file on S3 is {latest_on_s3}')
-        if cached_date in latest_on_s3:
+        if latest_on_s3 and cached_date in latest_on_s3:
             logger.info(f'Loaded model manager for {model_name} from cache.')
             return model_manager
     logger.info(f'Loading model manager for {model_name} from S3.')
+    # Pass the key we already found so it is not looked up again
     model_manager = load_model_manager_from_s3(
-        model_name=model_name, bucket=bucket)
-    model_manager_cache[model_name] = model_manager
+        model_name=model_name, key=latest_on_s3, bucket=bucket)
+    with _model_manager_cache_lock:
+        model_manager_cache[model_name] = model_manager
+        model_manager_cache.move_to_end(model_name)
+        while len(model_manager_cache) > MODEL_MANAGER_CACHE_SIZE:
+            evicted, _ = model_manager_cache.popitem(last=False)
+            _s3_freshness_cache.pop(evicted, None)
     return model_manager
 
 
@@ -14,6 +14,7 @@ import json
 
 
 batch = boto3.client('batch')
+s3 = boto3.client('s3')
 JOB_DEF = 'emmaa_jobdef'
 QUEUE = 'emmaa-after-update'
 PROJECT = 'aske'
@@ -74,7 +75,6 @@ def lambda_handler(event, context):
         A dict containing 'statusCode', with a valid HTTP status code, and any
         other data to be returned to Lambda.
     """
-    s3 = boto3.client('s3')
     records = event['Records']
     for rec in records:
         try:
@@ -12,6 +12,8 @@ in this directory.
 import boto3
 from datetime import datetime
 
+
+batch = boto3.client('batch')
 JOB_DEF = 'emmaa-email-notifications'
 QUEUE = 'emmaa-models-update-test'
 PROJECT = 'aske'
@@ -45,7 +47,6 @@ def lambda_handler(event, context):
         A dict containing 'statusCode', with a valid HTTP status code,
         'result', and 'job_id' to be returned to Lambda.
     """
-    batch = boto3.client('batch')
     core_command = 'bash scripts/git_and_run.sh'
     if BRANCH is not None:
         core_command += f' --branch {BRANCH} '
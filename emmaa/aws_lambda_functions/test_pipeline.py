@@ -13,6 +13,10 @@ import boto3
 import json
 
 
+s3 = boto3.client('s3')
+lam = boto3.client('lambda')
+
+
 def lambda_handler(event, context):
     """Invoke individual test corpus functions.
 
@@ -37,8 +41,6 @@ def lambda_handler(event, context):
     ret : dict
         A response returned by the latest call to emmaa-model-test function.
     """
-    s3 = boto3.client('s3')
-    lam = boto3.client('lambda')
     model_name = event['model']
     config_key = f'models/{model_name}/config.json'
     obj = s3.get_object(Bucket='emmaa', Key=config_key)
@@ -12,6 +12,8 @@ in this directory.
 import boto3
 from datetime import datetime
 
+
+batch = boto3.client('batch')
 JOB_DEF = 'emmaa_jobdef'
 QUEUE = 'emmaa-models-update-test'
 PROJECT = 'aske'
@@ -44,7 +46,6 @@ def lambda_handler(event, context):
         A dict containing 'statusCode', with a valid HTTP status code, and any
         other data to be returned to Lambda.
     """
-    batch = boto3.client('batch')
     records = event['Records']
     for rec in records:
         try:
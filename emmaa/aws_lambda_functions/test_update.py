@@ -12,6 +12,8 @@ in this directory.
 import boto3
 from datetime import datetime
 
+
+batch = boto3.client('batch')
 JOB_DEF = 'emmaa_jobdef'
 QUEUE = 'emmaa-models-update-test'
 PROJECT = 'aske'
@@ -46,7 +48,6 @@ def lambda_handler(event, context):
         and 'job_id' to be returned to Lambda.
     """
     model_name = event['model']
-    batch = boto3.client('batch')
     core_command = 'bash scripts/git_and_run.sh'
     if BRANCH is not None:
         core_command += f' --branch {BRANCH} '
@@ -1,7 +1,8 @@
+import io
 import boto3
 import sys
 from os import path
-from zipfile import ZipFile
+from zipfile import ZipFile, ZIP_DEFLATED
 
 HERE = path.dirname(path.abspath(__file__))
 
@@ -20,7 +21,8 @@ def upload_function(script_name, function_name):
         Name of a lambda function as specified on AWS Lambda.
     """
     lamb = boto3.client('lambda')
-    with ZipFile(path.join(HERE, 'lambda.zip'), 'w') as zf:
+    buf = io.BytesIO()
+    with ZipFile(buf, 'w', compression=ZIP_DEFLATED) as zf:
         zf.write(path.join(HERE, script_name),
                  f'emmaa/{path.basename(HERE)}/{script_name}')
         zf.write(path.join(HERE, '__init__.py'),
@@ -28,10 +30,9 @@ def upload_function(script_name, function_name):
         zf.write(path.join(HERE, path.pardir, '__init__.py'),
                  'emmaa/__init__.py')
 
-    with open(path.join(HERE, 'lambda.zip'), 'rb') as zf:
-        ret = lamb.update_function_code(ZipFile=zf.read(),
-                                        FunctionName=function_name)
-        print(ret)
+    ret = lamb.update_function_code(ZipFile=buf.getvalue(),
+                                    FunctionName=function_name)
+    print(ret)
     return
 
 def main():
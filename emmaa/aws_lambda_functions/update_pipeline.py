@@ -13,6 +13,10 @@ import boto3
 import json
 
 
+s3 = boto3.client('s3')
+lam = boto3.client('lambda')
+
+
 def lambda_handler(event, context):
     """Invoke individual model update functions.
 
@@ -44,8 +48,6 @@ def lambda_handler(event, context):
     ret : dict
         A response returned by the latest call to emmaa-model-update function.
     """
-    s3 = boto3.client('s3')
-    lam = boto3.client('lambda')
     objs = s3.list_objects_v2(Bucket='emmaa', Prefix='models/', Delimiter='/')
     prefixes = objs['CommonPrefixes']
     for prefix_dict in prefixes:
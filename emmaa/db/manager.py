@@ -7,7 +7,7 @@ __all__ = ['EmmaaDatabaseManager', 'EmmaaDatabaseError']
 
 import logging
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, func
 from sqlalchemy.orm import sessionmaker
 
 from .schema import EmmaaTable, User, Query, Base, Result, UserQuery, UserModel
@@ -146,7 +146,7 @@ class EmmaaDatabaseManager(object):
         return user_id
 
     def put_queries(self, user_email, user_id, query, model_ids,
-                    subscribe=True):
+                    subscribe=True, query_hashes=None):
         """Add queries to the database for a given user.
 
         Parameters
@@ -163,6 +163,10 @@ class EmmaaDatabaseManager(object):
             to apply these queries.
         subscribe : bool
             True if the user wishes to subscribe to this query.
+        query_hashes : Optional[dict]
+            A dictionary mapping model IDs to query-model hashes that were
+            already computed by the caller. Hashes for models not in it are
+            computed here.
         """
         logger.info(f"Got request to put query {query} for {user_email} "
                     f"for {model_ids} with subscribe={subscribe}")
@@ -204,8 +208,12 @@ class EmmaaDatabaseManager(object):
 
             new_queries = []
             new_user_queries = []
+            if query_hashes is None:
+                query_hashes = {}
             for model_id in model_ids:
-                qh = query.get_hash_with_model(model_id)
+                qh = query_hashes.get(model_id)
+                if qh is None:
+                    qh = query.get_hash_with_model(model_id)
 
                 # Add to queries if not present
                 if qh not in existing_hashes:
@@ -280,12 +288,48 @@ class EmmaaDatabaseManager(object):
             the model type for the result, and the result_json is the json
             containing corresponding result.
         """
+        self.put_results_for_models({model_id: query_results})
+
+    def put_results_for_models(self, query_results_by_model,
+                               query_hashes=None):
+        """Add new results for queries tested on several models at once.
+
+        All results are stored in a single transaction.
+
+        Parameters
+        ----------
+        query_results_by_model : dict
+            A dictionary keyed by the short, standard model IDs with lists of
+            (query, mc_type, result_json) tuples as values (same as
+            query_results in put_results).
+        query_hashes : Optional[dict]
+            If all results are for the same query, a dictionary mapping model
+            IDs to query-model hashes that were already computed by the
+            caller (same as in put_queries). Hashes for models not in it are
+            computed here, once for each query and model.
+        """
+        hashes = {}
+        hashed_results = []
+        for model_id, query_results in query_results_by_model.items():
+            for query, mc_type, result_json in query_results:
+                # Results for different model types share the query object
+                key = (model_id, id(query))
+                if key not in hashes:
+                    if query_hashes and model_id in query_hashes:
+                        hashes[key] = query_hashes[model_id]
+                    else:
+                        hashes[key] = query.get_hash_with_model(model_id)
+                hashed_results.append((hashes[key], mc_type, result_json))
+        if not hashed_results:
+            return
+        # Get the latest result hashes for all queries in one go.
+        latest_hashes = self.get_all_result_hashes_for_queries(
+            {query_hash for query_hash, _, _ in hashed_results})
         results = []
-        for query, mc_type, result_json in query_results:
-            query_hash = query.get_hash_with_model(model_id)
-            all_result_hashes = self.get_all_result_hashes(query_hash, mc_type)
+        for query_hash, mc_type, result_json in hashed_results:
+            all_result_hashes = latest_hashes.get((query_hash, mc_type))
             if all_result_hashes is not None:
-                delta = set(result_json.keys()) - all_result_hashes
+                delta = result_json.keys() - all_result_hashes
                 new_all_hashes = all_result_hashes.union(delta)
             else:  # this is the first result
                 delta = set()
@@ -335,6 +379,40 @@ class EmmaaDatabaseManager(object):
             return set(all_sets[0][0])
         return None
 
+    def get_all_result_hashes_for_queries(self, query_hashes):
+        """Get sets of all result hashes for a number of queries.
+
+        Parameters
+        ----------
+        query_hashes : iterable[int]
+            Query-model hashes to get the latest result hashes for.
+
+        Returns
+        -------
+        all_result_hashes : dict
+            A dictionary keyed by (query_hash, mc_type) tuples with sets of
+            all result hashes from the latest result for each key. Pairs
+            without any stored results are not included.
+        """
+        query_hashes = list(query_hashes)
+        if not query_hashes:
+            return {}
+        with self.get_session() as sess:
+            latest = (sess.query(Result.query_hash, Result.mc_type,
+                                 func.max(Result.date).label('date'))
+                      .filter(Result.query_hash.in_(query_hashes))
+                      .group_by(Result.query_hash, Result.mc_type)
+                      .subquery())
+            q = (sess.query(Result.query_hash, Result.mc_type,
+                            Result.all_result_hashes)
+                 .filter(Result.query_hash == latest.c.query_hash,
+                         Result.mc_type == latest.c.mc_type,
+                         Result.date == latest.c.date))
+        all_result_hashes = {}
+        for query_hash, mc_type, hashes in q.all():
+            all_result_hashes.setdefault((query_hash, mc_type), set(hashes))
+        return all_result_hashes
+
     def get_results(self, user_email, latest_order=1, query_type=None):
         """Get the results for which the user has registered.
 
@@ -181,11 +181,16 @@ class EmmaaModel(object):
             by searches as values.
         """
         terms_to_pmids = {}
+        last_request = None
         for term in search_terms:
+            # Keep at least a second between the starts of two requests
+            # but don't wait for the time the previous request already took
+            if last_request is not None:
+                time.sleep(max(0, 1 - (time.time() - last_request)))
+            last_request = time.time()
             pmids = pubmed_client.get_ids(term.search_term, reldate=date_limit)
             logger.info(f'{len(pmids)} PMIDs found for {term.search_term}')
             terms_to_pmids[term] = pmids
-            time.sleep(1)
         return terms_to_pmids
 
     @staticmethod
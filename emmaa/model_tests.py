@@ -2,14 +2,16 @@
 import logging
 import itertools
 import jsonpickle
+import multiprocessing
 import os
 import sys
 from collections import defaultdict
-from fnvhash import fnv1a_32
+from concurrent.futures import ProcessPoolExecutor
 from urllib import parse
 from copy import deepcopy
 from indra.explanation.model_checker import PysbModelChecker, \
-    PybelModelChecker, SignedGraphModelChecker, UnsignedGraphModelChecker
+    PybelModelChecker, SignedGraphModelChecker, UnsignedGraphModelChecker, \
+    PathResult, PathMetric
 from indra.explanation.reporting import stmts_from_pysb_path, \
     stmts_from_pybel_path, stmts_from_indranet_path, PybelEdge, \
     pybel_edge_to_english, RefEdge
@@ -59,6 +61,19 @@ MODEL_TYPES = {'path': ['pysb', 'pybel', 'signed_graph', 'unsigned_graph'],
                'simulation': ['dynamic', 'pysb']}
 
 
+def fnv1a_32(data):
+    """Return the 32 bit FNV-1a hash of the given bytes.
+
+    This gives the same values as fnvhash.fnv1a_32 but avoids its per byte
+    function call and modulo, which makes hashing long responses about twice
+    as fast.
+    """
+    hval = 0x811c9dc5
+    for byte in data:
+        hval = ((hval ^ byte) * 0x01000193) & 0xffffffff
+    return hval
+
+
 class ModelManager(object):
     """Manager to generate and store properties of a model and relevant tests.
 
@@ -113,9 +128,40 @@ class ModelManager(object):
                     self.mc_mapping[mc_type][1](assembled_model))
             self.mc_types[mc_type]['test_results'] = []
         self.entities = self.model.get_assembled_entities()
+        self.entity_names = frozenset(e.name for e in self.entities)
         self.applicable_tests = []
         self.date_str = self.model.date_str
         self.path_stmt_counts = defaultdict(int)
+        # Sentences and links for statements in reported paths, reused
+        # across tests and queries that share statements
+        self._sentence_cache = {}
+        # Model checking parameters keyed by the arguments of
+        # _get_test_configs
+        self._test_configs = {}
+        self._evidence_link_params = None
+        # Signed node graphs of the model checkers keyed by model type and
+        # edge filter function
+        self._mc_graphs = {}
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # Caches are rebuilt on demand so they are not stored
+        state['_sentence_cache'] = {}
+        state['_test_configs'] = {}
+        state['_evidence_link_params'] = None
+        state['_mc_graphs'] = {}
+        return state
+
+    def __setstate__(self, state):
+        # Model managers pickled before caches were added don't have them
+        state.setdefault('_sentence_cache', {})
+        state.setdefault('_test_configs', {})
+        state.setdefault('_evidence_link_params', None)
+        state.setdefault('_mc_graphs', {})
+        if 'entity_names' not in state:
+            state['entity_names'] = frozenset(
+                e.name for e in state['entities'])
+        self.__dict__.update(state)
 
     @classmethod
     def load_from_statements(cls, model_name, mode='local', date=None,
@@ -150,8 +196,15 @@ class ModelManager(object):
                          add_namespaces=add_ns,
                          edge_filter_func=edge_filter_func)
         else:
-            mc.graph = None
-            mc.get_graph(edge_filter_func=edge_filter_func)
+            # Graphs of the other model types don't depend on the statements
+            # so they are only built once for each edge filter
+            cache_key = (mc_type, edge_filter_func)
+            if cache_key in self._mc_graphs:
+                mc.graph = self._mc_graphs[cache_key]
+            else:
+                mc.graph = None
+                self._mc_graphs[cache_key] = mc.get_graph(
+                    edge_filter_func=edge_filter_func)
         if mc_type in ('signed_graph', 'unsigned_graph'):
             mc.nodes_to_agents = {ag.name: ag for ag in self.entities}
         return mc
@@ -164,18 +217,55 @@ class ModelManager(object):
         """Add a result to a list of results."""
         self.mc_types[mc_type]['test_results'].append(result)
 
-    def run_all_tests(self, filter_func=None, edge_filter_func=None):
-        """Run all applicable tests with all available ModelCheckers."""
+    def run_all_tests(self, filter_func=None, edge_filter_func=None,
+                      parallel=False):
+        """Run all applicable tests with all available ModelCheckers.
+
+        If parallel is True, each ModelChecker runs the tests in a separate
+        forked process (where the fork start method is available). Only the
+        test results are sent back from the forked processes, so after a
+        parallel run the model checkers of this ModelManager and its cached
+        model checker graphs (_mc_graphs) are unchanged, unlike after a
+        sequential run which updates them in place.
+        """
         max_path_length, max_paths = self._get_test_configs()
-        for mc_type in self.mc_types:
-            if mc_type not in MODEL_TYPES['path']:
-                continue
+        mc_types = [mc_type for mc_type in self.mc_types
+                    if mc_type in MODEL_TYPES['path']]
+        if parallel and len(mc_types) > 1 and \
+                'fork' in multiprocessing.get_all_start_methods():
+            logger.info(f'Running the tests with {len(mc_types)} '
+                        f'ModelCheckers in parallel.')
+            # The arguments are handed to each worker when it is forked so
+            # the model manager is inherited instead of pickled for each task
+            test_run_args = dict(
+                model_manager=self, max_path_length=max_path_length,
+                max_paths=max_paths, filter_func=filter_func,
+                edge_filter_func=edge_filter_func)
+            with ProcessPoolExecutor(
+                    len(mc_types),
+                    mp_context=multiprocessing.get_context('fork'),
+                    initializer=_init_test_run_worker,
+                    initargs=(test_run_args,)) as pool:
+                all_results = list(pool.map(_check_tests_in_fork, mc_types))
+            for mc_type, results in zip(mc_types, all_results):
+                for result in results:
+                    self.add_result(mc_type, result)
+            return
+        for mc_type in mc_types:
             self.run_tests_per_mc(mc_type, max_path_length, max_paths,
                                   filter_func, edge_filter_func)
 
     def run_tests_per_mc(self, mc_type, max_path_length, max_paths,
                          filter_func=None, edge_filter_func=None):
         """Run all applicable tests with one ModelChecker."""
+        results = self._check_tests_per_mc(
+            mc_type, max_path_length, max_paths, filter_func,
+            edge_filter_func)
+        for result in results:
+            self.add_result(mc_type, result)
+
+    def _check_tests_per_mc(self, mc_type, max_path_length, max_paths,
+                            filter_func=None, edge_filter_func=None):
         mc = self.get_updated_mc(
             mc_type, [test.stmt for test in self.applicable_tests],
             edge_filter_func=edge_filter_func)
@@ -185,33 +275,41 @@ class ModelManager(object):
         results = mc.check_model(
             max_path_length=max_path_length, max_paths=max_paths,
             agent_filter_func=filter_func, edge_filter_func=edge_filter_func)
-        for (stmt, result) in results:
-            self.add_result(mc_type, result)
+        return [result for (stmt, result) in results]
 
-    def make_path_json(self, mc_type, result_paths):
-        paths = []
+    def make_path_json(self, mc_type, result_paths, hashed=False):
+        """Return the paths in JSON format together with their JSON lines.
+
+        If hashed is True, the paths are returned as a dictionary keyed by
+        their hashes (same as hash_response_list would return) which are
+        computed while the paths are built.
+        """
+        paths = {} if hashed else []
         json_lines = []
+        # These are the same for all paths of a given model type
+        report_function = self.mc_mapping[mc_type][2]
+        model = self.mc_types[mc_type]['model']
+        stmts = self.model.assembled_stmts
+        merge = mc_type in ('signed_graph', 'unsigned_graph')
+        if mc_type == 'pysb':
+            def get_path_stmts(path):
+                return [[st] for st in report_function(path, model, stmts)]
+        elif mc_type == 'pybel':
+            def get_path_stmts(path):
+                return report_function(path, model, False, stmts)
+        elif mc_type == 'signed_graph':
+            def get_path_stmts(path):
+                return report_function(path, model, True, False, stmts)
+        elif mc_type == 'unsigned_graph':
+            def get_path_stmts(path):
+                return report_function(path, model, False, False, stmts)
         for path in result_paths:
             path_nodes = []
             edge_list = []
             path_node_list = []
             hashes = []
-            report_function = self.mc_mapping[mc_type][2]
-            model = self.mc_types[mc_type]['model']
-            stmts = self.model.assembled_stmts
-            if mc_type == 'pysb':
-                report_stmts = report_function(path, model, stmts)
-                path_stmts = [[st] for st in report_stmts]
-                merge = False
-            elif mc_type == 'pybel':
-                path_stmts = report_function(path, model, False, stmts)
-                merge = False
-            elif mc_type == 'signed_graph':
-                path_stmts = report_function(path, model, True, False, stmts)
-                merge = True
-            elif mc_type == 'unsigned_graph':
-                path_stmts = report_function(path, model, False, False, stmts)
-                merge = True
+            path_sentences = []
+            path_stmts = get_path_stmts(path)
             for i, step in enumerate(path_stmts):
                 edge_nodes = []
                 if len(step) < 1:
@@ -242,15 +340,14 @@ class ModelManager(object):
                         agents = sorted(
                             [ag for ag in agents if ag is not None],
                             key=lambda x: x != path_nodes[-1])
+                    arrow = ARROW_DICT.get(stmt_type, u"\u2192")
+                    last_ix = len(agents) - 1
                     for j, ag in enumerate(agents):
                         if ag is not None:
                             edge_nodes.append(ag)
-                        if j == (len(agents) - 1):
+                        if j == last_ix:
                             break
-                        if stmt_type in ARROW_DICT:
-                            edge_nodes.append(ARROW_DICT[stmt_type])
-                        else:
-                            edge_nodes.append(u"\u2192")
+                        edge_nodes.append(arrow)
                 if i == 0:
                     for n in edge_nodes:
                         path_nodes.append(n)
@@ -261,6 +358,9 @@ class ModelManager(object):
                         path_nodes.append(n)
                     path_node_list.append(edge_nodes[-1])
                 step_sentences = self._make_path_stmts(step, merge=merge)
+                if hashed:
+                    path_sentences += [sentence for (_, sentence, _)
+                                       in step_sentences]
                 edge_dict = {'edge': ' '.join(edge_nodes),
                              'stmts': step_sentences}
                 edge_list.append(edge_dict)
@@ -268,24 +368,30 @@ class ModelManager(object):
                          'edge_list': edge_list}
             one_line_path_json = {'nodes': path_node_list, 'edges': hashes,
                                   'graph_type': mc_type}
-            paths.append(path_json)
+            if hashed:
+                path_hash = str(fnv1a_32(
+                    ' '.join(path_sentences).encode('utf-8')))
+                paths[path_hash] = path_json
+            else:
+                paths.append(path_json)
             json_lines.append(one_line_path_json)
         return paths, json_lines
 
     def _make_path_stmts(self, stmts, merge=False):
         sentences = []
-        date = strip_out_date(self.date_str, 'date')
         if merge and isinstance(stmts[0], Statement):
+            cache_key = tuple(stmt.get_hash() for stmt in stmts)
+            if cache_key in self._sentence_cache:
+                return list(self._sentence_cache[cache_key])
+            link_params = self._get_evidence_link_params()
             groups = group_and_sort_statements(stmts, grouping_level='relation')
             for _, rel_key, group_stmts, _ in groups:
                 sentence = make_string_from_relation_key(rel_key) + '.'
-                stmt_hashes = [gr_st.get_hash()
-                               for _, _, gr_st, _ in group_stmts]
-                url_param = parse.urlencode(
-                    {'stmt_hash': stmt_hashes, 'source': 'model_statement',
-                     'model': self.model.name, 'date': date}, doseq=True)
-                link = f'/evidence?{url_param}'
+                hash_params = '&'.join(f'stmt_hash={gr_st.get_hash()}'
+                                       for _, _, gr_st, _ in group_stmts)
+                link = f'/evidence?{hash_params}&{link_params}'
                 sentences.append((link, sentence, ''))
+            self._sentence_cache[cache_key] = tuple(sentences)
         else:
             for stmt in stmts:
                 if isinstance(stmt, PybelEdge):
@@ -295,16 +401,29 @@ class ModelManager(object):
                     sentence = stmt.to_english()
                     sentences.append(('', sentence, ''))
                 else:
-                    ea = EnglishAssembler([stmt])
-                    sentence = ea.make_model()
-                    stmt_hashes = [stmt.get_hash()]
-                    url_param = parse.urlencode(
-                        {'stmt_hash': stmt_hashes, 'source': 'model_statement',
-                         'model': self.model.name, 'date': date}, doseq=True)
-                    link = f'/evidence?{url_param}'
-                    sentences.append((link, sentence, ''))
+                    stmt_hash = stmt.get_hash()
+                    if stmt_hash not in self._sentence_cache:
+                        ea = EnglishAssembler([stmt])
+                        sentence = ea.make_model()
+                        link = (f'/evidence?stmt_hash={stmt_hash}&'
+                                f'{self._get_evidence_link_params()}')
+                        self._sentence_cache[stmt_hash] = (link, sentence, '')
+                    sentences.append(self._sentence_cache[stmt_hash])
         return sentences
 
+    def _get_evidence_link_params(self):
+        # Query string parameters shared by all evidence links of this model
+        # manager. Statement hashes are integers and need no quoting, so they
+        # are prepended to these without going through urlencode. Like the
+        # sentences in _sentence_cache, these are built once for the
+        # date_str the model manager was created with.
+        if self._evidence_link_params is None:
+            date = strip_out_date(self.date_str, 'date')
+            self._evidence_link_params = parse.urlencode(
+                {'source': 'model_statement', 'model': self.model.name,
+                 'date': date})
+        return self._evidence_link_params
+
     def make_result_code(self, result):
         result_code = result.result_code
         return RESULT_CODES[result_code]
@@ -492,6 +611,9 @@ class ModelManager(object):
 
     def _get_test_configs(self, mode='test', qtype='statement_checking',
                           mc_type=None, default_length=5, default_paths=1):
+        cache_key = (mode, qtype, mc_type, default_length, default_paths)
+        if cache_key in self._test_configs:
+            return self._test_configs[cache_key]
         if mode == 'test':
             config = self.model.test_config
         elif mode == 'query':
@@ -516,6 +638,7 @@ class ModelManager(object):
                 max_paths = default_paths
         logger.info('Parameters for model checking: %d, %d' %
                     (max_path_length, max_paths))
+        self._test_configs[cache_key] = (max_path_length, max_paths)
         return (max_path_length, max_paths)
 
     def _get_dynamic_components(self, qtype='dynamic'):
@@ -547,16 +670,14 @@ class ModelManager(object):
         sentence.
         """
         if result.paths:
-            response, path_lines = self.make_path_json(mc_type, result.paths)
-            return self.hash_response_list(response), path_lines
+            return self.make_path_json(mc_type, result.paths, hashed=True)
         else:
             response = self.make_result_code(result)
             return self.hash_response_list(response), response
 
     def process_open_query_response(self, mc_type, paths):
         if paths:
-            response, path_lines = self.make_path_json(mc_type, paths)
-            return self.hash_response_list(response), path_lines
+            return self.make_path_json(mc_type, paths, hashed=True)
         else:
             response = 'No paths found that satisfy this query'
             return self.hash_response_list(response), response
@@ -579,9 +700,8 @@ class ModelManager(object):
                 response_hash = str(fnv1a_32(response_str.encode('utf-8')))
                 response_dict[response_hash] = resp
         elif isinstance(response, dict):
-            results = [str(response.get('sat_rate')),
-                       str(response.get('num_sim'))]
-            response_str = ' '.join(results)
+            response_str = (f"{response.get('sat_rate')} "
+                            f"{response.get('num_sim')}")
             response_hash = str(fnv1a_32(response_str.encode('utf-8')))
             response_dict[response_hash] = response
         else:
@@ -591,11 +711,15 @@ class ModelManager(object):
     def results_to_json(self, test_data=None):
         """Put test results to json format."""
         pickler = jsonpickle.pickler.Pickler()
+        path_mc_types = [mc_type for mc_type in self.mc_types
+                         if mc_type in MODEL_TYPES['path']]
+        # Look up the result lists once instead of for every test
+        results_by_mc_type = [(mc_type, self.mc_types[mc_type]['test_results'])
+                              for mc_type in path_mc_types]
         results_json = []
         results_json.append({
             'model_name': self.model.name,
-            'mc_types': [mc_type for mc_type in self.mc_types
-                         if mc_type in MODEL_TYPES['path']],
+            'mc_types': path_mc_types,
             'path_stmt_counts': self.path_stmt_counts,
             'date_str': self.date_str,
             'test_data': test_data})
@@ -603,14 +727,12 @@ class ModelManager(object):
         for ix, test in enumerate(self.applicable_tests):
             test_ix_results = {'test_type': test.__class__.__name__,
                                'test_json': test.to_json()}
-            for mc_type in self.mc_types:
-                if mc_type not in MODEL_TYPES['path']:
-                    continue
-                result = self.mc_types[mc_type]['test_results'][ix]
+            for mc_type, mc_results in results_by_mc_type:
+                result = mc_results[ix]
                 path_json, test_json_lines = self.make_path_json(
                     mc_type, result.paths)
                 test_ix_results[mc_type] = {
-                    'result_json': pickler.flatten(result),
+                    'result_json': _flatten_result(result, pickler),
                     'path_json': path_json,
                     'result_code': self.make_result_code(result)}
                 for line in test_json_lines:
@@ -632,7 +754,7 @@ class ModelManager(object):
         latest_paths_key = (f'paths/{self.model.name}/{test_corpus}'
                             '_latest_paths.jsonl')
         logger.info(f'Uploading test results to {result_key}')
-        save_json_to_s3(json_dict, bucket, result_key)
+        save_json_to_s3(json_dict, bucket, result_key, compress=True)
         logger.info(f'Uploading test paths to {paths_key}')
         save_json_to_s3(json_lines, bucket, paths_key, save_format='jsonl')
         save_json_to_s3(json_lines, bucket, latest_paths_key, 'jsonl')
@@ -682,22 +804,21 @@ class TestManager(object):
         """
         logger.info(f'Checking applicability of {len(self.tests)} tests to '
                     f'{len(self.model_managers)} models')
-        for model_manager, test in itertools.product(self.model_managers,
-                                                     self.tests):
-            if test_connector.applicable(model_manager, test):
-                model_manager.add_test(test)
-                logger.debug(f'Test {test.stmt} is applicable')
-            else:
-                logger.debug(f'Test {test.stmt} is not applicable')
+        for model_manager, test in test_connector.get_applicable_pairs(
+                self.model_managers, self.tests):
+            model_manager.add_test(test)
+            logger.debug('Test %s is applicable', test.stmt)
         logger.info(f'Created tests for {len(self.model_managers)} models.')
         for model_manager in self.model_managers:
             logger.info(f'Created {len(model_manager.applicable_tests)} tests '
                         f'for {model_manager.model.name} model.')
 
-    def run_tests(self, filter_func=None, edge_filter_func=None):
+    def run_tests(self, filter_func=None, edge_filter_func=None,
+                  parallel=False):
         """Run tests for a list of model-test pairs"""
         for model_manager in self.model_managers:
-            model_manager.run_all_tests(filter_func, edge_filter_func)
+            model_manager.run_all_tests(filter_func, edge_filter_func,
+                                        parallel)
 
 
 class TestConnector(object):
@@ -710,23 +831,48 @@ class TestConnector(object):
         """Return True if the test is applicable to the given model."""
         return True
 
+    def get_applicable_pairs(self, models, tests):
+        """Yield (model, test) pairs for which the test is applicable.
+
+        Pairs are yielded in the order of models and then in the order of
+        tests for each model.
+        """
+        for model, test in itertools.product(models, tests):
+            if self.applicable(model, test):
+                yield model, test
+
 
 class ScopeTestConnector(TestConnector):
     """Determines applicability of a test to a model by overlap in scope."""
     @staticmethod
     def applicable(model, test):
         """Return True of all test entities are in the set of model entities"""
-        model_entities = model.entities
         test_entities = test.get_entities()
-        return ScopeTestConnector._overlap(model_entities, test_entities)
+        return ScopeTestConnector._overlap(model.entity_names, test_entities)
 
     @staticmethod
-    def _overlap(model_entities, test_entities):
-        me_names = {e.name for e in model_entities}
+    def _overlap(me_names, test_entities):
         te_names = {e.name for e in test_entities}
-        # If all test entities are in model entities, we get an empty set here
-        # so we return True
-        return not te_names - me_names
+        return te_names.issubset(me_names)
+
+    def get_applicable_pairs(self, models, tests):
+        """Yield (model, test) pairs for which the test is applicable.
+
+        The entity names of each test are collected once and reused for
+        all models. Tests with the same entity names share one
+        applicability check per model.
+        """
+        test_names = [frozenset(e.name for e in test.get_entities())
+                      for test in tests]
+        for model in models:
+            applicable_by_names = {}
+            for test, te_names in zip(tests, test_names):
+                applicable = applicable_by_names.get(te_names)
+                if applicable is None:
+                    applicable = te_names.issubset(model.entity_names)
+                    applicable_by_names[te_names] = applicable
+                if applicable:
+                    yield model, test
 
 
 class RefinementTestConnector(TestConnector):
@@ -736,7 +882,6 @@ class RefinementTestConnector(TestConnector):
     @staticmethod
     def applicable(model, test):
         """Return True of all test entities are in the set of model entities"""
-        model_entities = model.entities
         test_entities = test.get_entities()
         test_entity_groups = []
         for te in test_entities:
@@ -748,21 +893,19 @@ class RefinementTestConnector(TestConnector):
                 ag = Agent(name, db_refs={ns: gr})
                 te_group.append(ag)
             test_entity_groups.append(te_group)
-        return RefinementTestConnector._overlap(model_entities,
+        return RefinementTestConnector._overlap(model.entity_names,
                                                 test_entity_groups)
 
     @staticmethod
-    def _ref_group_overlap(model_entities, test_entity_group):
-        me_names = {e.name for e in model_entities}
-        te_names = {e.name for e in test_entity_group}
+    def _ref_group_overlap(me_names, test_entity_group):
         # We need at least one intersection between these groups
-        return me_names.intersection(te_names)
+        return any(e.name in me_names for e in test_entity_group)
 
     @staticmethod
-    def _overlap(model_entities, test_entity_groups):
+    def _overlap(me_names, test_entity_groups):
         # We need to get overlap with each test entity group
-        return all([RefinementTestConnector._ref_group_overlap(
-            model_entities, te_group) for te_group in test_entity_groups])
+        return all(RefinementTestConnector._ref_group_overlap(
+            me_names, te_group) for te_group in test_entity_groups)
 
 
 class EmmaaTest(object):
@@ -836,7 +979,8 @@ def save_model_manager_to_s3(model_name, model_manager,
     model_manager.model.stmts = []
     model_manager.model.assembled_stmts = []
     save_pickle_to_s3(model_manager, bucket,
-                      f'results/{model_name}/model_manager_{date_str}.pkl')
+                      f'results/{model_name}/model_manager_{date_str}.pkl',
+                      compress=True)
 
 
 def load_model_manager_from_s3(model_name=None, key=None,
@@ -911,21 +1055,28 @@ def model_to_tests(model_name, upload=True, bucket=EMMAA_BUCKET_NAME):
                  'tests': tests}
     if upload:
         save_tests_to_s3(test_dict, bucket,
-                         f'tests/{model_name}_tests_{date_str}.pkl', 'pkl')
+                         f'tests/{model_name}_tests_{date_str}.pkl', 'pkl',
+                         compress=True)
     return test_dict
 
 
-def save_tests_to_s3(tests, bucket, key, save_format='pkl'):
-    """Save tests in pkl, json or jsonl format."""
+def save_tests_to_s3(tests, bucket, key, save_format='pkl',
+                     compress=False):
+    """Save tests in pkl, json or jsonl format.
+
+    If compress is True, the tests are stored gzip compressed under the same
+    key and are decompressed transparently by load_tests_from_s3.
+    """
     if save_format == 'pkl':
-        save_pickle_to_s3(tests, bucket, key)
+        save_pickle_to_s3(tests, bucket, key, compress=compress)
     elif save_format in ['json', 'jsonl']:
         if isinstance(tests, list):
             stmts = [test.stmt for test in tests]
         elif isinstance(tests, dict):
             stmts = [test.stmt for test in tests['tests']]
         stmts_json = stmts_to_json(stmts)
-        save_json_to_s3(stmts_json, bucket, key, save_format)
+        save_json_to_s3(stmts_json, bucket, key, save_format,
+                        compress=compress)
 
 
 def run_model_tests_from_s3(model_name, test_corpus='large_corpus_tests',
@@ -977,8 +1128,63 @@ def run_model_tests_from_s3(model_name, test_corpus='large_corpus_tests',
         edge_filter_func_name = mm.model.test_config['edge_filters'].get(
             test_corpus)
         edge_filter_func = edge_filter_functions.get(edge_filter_func_name)
-    tm.run_tests(filter_func, edge_filter_func)
+    tm.run_tests(filter_func, edge_filter_func,
+                 mm.model.test_config.get('parallel', False))
     # Optionally upload test results to S3
     if upload_results:
         mm.upload_results(test_corpus, test_data, bucket=bucket)
     return mm
+
+
+# Arguments of a parallel test run, only set inside the worker processes
+_worker_test_run = {}
+
+
+def _init_test_run_worker(test_run_args):
+    _worker_test_run.update(test_run_args)
+
+
+def _check_tests_in_fork(mc_type):
+    kwargs = dict(_worker_test_run)
+    model_manager = kwargs.pop('model_manager')
+    return model_manager._check_tests_per_mc(mc_type, **kwargs)
+
+
+class _NotFlattenable(Exception):
+    pass
+
+
+def _flatten_result(result, pickler):
+    """Return the JSON that jsonpickle would produce for a PathResult.
+
+    This avoids going through the generic reflection of jsonpickle. If the
+    result contains any object we don't know how to encode, the whole result
+    is flattened by jsonpickle so that references inside it stay consistent.
+
+    The only difference from jsonpickle is in how an object that appears
+    more than once in the result (e.g. the same PathMetric in two places)
+    is encoded. jsonpickle writes a {'py/id': N} back-reference for the
+    repeated occurrences while here each occurrence is written out as a
+    full copy. Both decode to equal values but the decoded copies are not
+    the same object.
+    """
+    try:
+        return _flatten_value(result)
+    except _NotFlattenable:
+        return pickler.flatten(result)
+
+
+def _flatten_value(value):
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, list):
+        return [_flatten_value(v) for v in value]
+    if isinstance(value, tuple):
+        return {'py/tuple': [_flatten_value(v) for v in value]}
+    if type(value) in (PathResult, PathMetric):
+        cls = type(value)
+        flat = {'py/object': f'{cls.__module__}.{cls.__name__}'}
+        for k, v in value.__dict__.items():
+            flat[k] = _flatten_value(v)
+        return flat
+    raise _NotFlattenable()
@@ -12,10 +12,15 @@ literature searches. Example:
     model = lp.make_model(estmts, upload_to_s3=True)
 
 """
+import math
 import tqdm
 import logging
 import datetime
-from collections import defaultdict
+import threading
+from copy import deepcopy
+from collections import deque
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 from indra.util import batch_iter
 from indra_db import get_db
 from indra_db.util import distill_stmts
@@ -25,6 +30,8 @@ from indra.statements import stmts_from_json
 from . import SearchTerm
 from emmaa.model import EmmaaModel
 from emmaa.statements import EmmaaStatement
+from emmaa.readers.db_client_reader import get_primary_db, \
+    reset_primary_db
 
 
 logger = logging.getLogger(__name__)
@@ -65,7 +72,7 @@ class LiteraturePrior:
         else:
             self.assembly_config = {}
 
-    def get_statements(self, mode='all', batch_size=100):
+    def get_statements(self, mode='all', batch_size=100, n_workers=1):
         """Return EMMAA Statements for this prior's literature set.
 
         Parameters
@@ -78,6 +85,9 @@ class LiteraturePrior:
         batch_size : Optional[int]
             Determines how many PMIDs to fetch statements for in each
             iteration. Default: 100.
+        n_workers : Optional[int]
+            The number of threads fetching batches of statements from the
+            INDRA DB concurrently. Default: 1.
 
         Returns
         -------
@@ -88,21 +98,22 @@ class LiteraturePrior:
         terms_to_pmids = \
             EmmaaModel.search_pubmed(search_terms=self.search_terms,
                                      date_limit=None)
-        pmids_to_terms = defaultdict(list)
+        pmids_to_terms = {}
         for term, pmids in terms_to_pmids.items():
             for pmid in pmids:
-                pmids_to_terms[pmid].append(term)
-        pmids_to_terms = dict(pmids_to_terms)
-        all_pmids = set(pmids_to_terms.keys())
-        raw_statements_by_pmid = \
-            get_raw_statements_for_pmids(all_pmids, mode=mode,
-                                         batch_size=batch_size)
+                pmids_to_terms.setdefault(pmid, []).append(term)
+        # Many PMIDs are found by the same combination of search terms, these
+        # share a single tuple of terms
+        unique_terms = {}
+        pmids_to_terms = {
+            pmid: unique_terms.setdefault(tuple(terms), tuple(terms))
+            for pmid, terms in pmids_to_terms.items()}
+        all_pmids = pmids_to_terms.keys()
         timestamp = datetime.datetime.now()
-        estmts = []
-        for pmid, stmts in raw_statements_by_pmid.items():
-            for stmt in stmts:
-                estmts.append(EmmaaStatement(stmt, timestamp,
-                                             pmids_to_terms[pmid]))
+        estmts = [EmmaaStatement(stmt, timestamp, pmids_to_terms[pmid])
+                  for pmid, stmt in iter_raw_statements_for_pmids(
+                      all_pmids, mode=mode, batch_size=batch_size,
+                      n_workers=n_workers)]
         return estmts
 
     def get_config_from(self, assembly_config_template):
@@ -118,9 +129,9 @@ class LiteraturePrior:
         dict
             The assembly config of the given template model.
         """
-        from emmaa.model import load_config_from_s3
-        config = load_config_from_s3(assembly_config_template)
-        return config.get('assembly')
+        config = _load_template_config(assembly_config_template)
+        # The cached config is shared so the caller gets its own copy
+        return deepcopy(config.get('assembly'))
 
     def make_config(self, upload_to_s3=False):
         """Return a config dict fot the model, optionally upload to S3.
@@ -202,7 +213,8 @@ class LiteraturePrior:
         return model
 
 
-def get_raw_statements_for_pmids(pmids, mode='all', batch_size=100):
+def get_raw_statements_for_pmids(pmids, mode='all', batch_size=100,
+                                 db=None, n_workers=1):
     """Return EmmaaStatements based on extractions from given PMIDs.
 
     Parameters
@@ -217,6 +229,15 @@ def get_raw_statements_for_pmids(pmids, mode='all', batch_size=100):
     batch_size : Optional[int]
         Determines how many PMIDs to fetch statements for in each
         iteration. Default: 100.
+    db : Optional[indra_db.DatabaseManager]
+        A handle to the INDRA database. If not given, the shared handle to
+        the primary database is used. Ignored if n_workers is more than 1
+        since a handle can't be shared between threads.
+    n_workers : Optional[int]
+        The number of threads fetching batches of statements concurrently.
+        At most this many batches are fetched ahead of the one being
+        consumed. Each thread opens its own handle to the primary database
+        which is disposed of when fetching is done. Default: 1.
 
     Returns
     -------
@@ -224,32 +245,128 @@ def get_raw_statements_for_pmids(pmids, mode='all', batch_size=100):
         A dict keyed by PMID with values INDRA Statements obtained
         from the given PMID.
     """
-    db = get_db('primary')
-    logger.info(f'Getting raw statements for {len(pmids)} PMIDs')
-    all_stmts = defaultdict(list)
-    for pmid_batch in tqdm.tqdm(batch_iter(pmids, return_func=set,
-                                           batch_size=batch_size),
-                                total=len(pmids)/batch_size):
-        if mode == 'distilled':
-            clauses = [
-                db.TextRef.pmid.in_(pmid_batch),
-                db.TextContent.text_ref_id == db.TextRef.id,
-                db.Reading.text_content_id == db.TextContent.id,
-                db.RawStatements.reading_id == db.Reading.id]
-            distilled_stmts = distill_stmts(db, get_full_stmts=True,
-                                            clauses=clauses)
-            for stmt in distilled_stmts:
-                all_stmts[stmt.evidence[0].pmid].append(stmt)
-        else:
-            id_stmts = \
-                get_raw_stmt_jsons_from_papers(pmid_batch, id_type='pmid',
-                                               db=db)
-            for pmid, stmt_jsons in id_stmts.items():
-                all_stmts[pmid] += stmts_from_json(stmt_jsons)
-    all_stmts = dict(all_stmts)
+    all_stmts = {}
+    for pmid, stmt in iter_raw_statements_for_pmids(
+            pmids, mode=mode, batch_size=batch_size, db=db,
+            n_workers=n_workers):
+        all_stmts.setdefault(pmid, []).append(stmt)
     return all_stmts
 
 
+def iter_raw_statements_for_pmids(pmids, mode='all', batch_size=100,
+                                  db=None, n_workers=1):
+    """Yield PMIDs and INDRA Statements extracted from them batch by batch.
+
+    Unlike get_raw_statements_for_pmids, only the statements of the current
+    batch of PMIDs (and of at most n_workers batches fetched ahead when
+    running in threads) are held in memory. See get_raw_statements_for_pmids for
+    a description of the parameters.
+
+    Yields
+    ------
+    tuple(str, indra.statements.Statement)
+        A PMID and an INDRA Statement obtained from this PMID.
+    """
+    logger.info(f'Getting raw statements for {len(pmids)} PMIDs')
+    batches = batch_iter(pmids, return_func=set, batch_size=batch_size)
+    n_batches = math.ceil(len(pmids) / batch_size)
+    if n_workers > 1:
+        yield from _iter_batch_statements_threaded(batches, n_batches, mode,
+                                                   n_workers)
+    else:
+        shared_db = db is None
+        if shared_db:
+            db = get_primary_db()
+        for pmid_batch in tqdm.tqdm(batches, total=n_batches, mininterval=1):
+            try:
+                pmid_stmts = _get_batch_statements(db, pmid_batch, mode)
+            except Exception:
+                if shared_db:
+                    reset_primary_db()
+                raise
+            yield from pmid_stmts
+
+
+def _iter_batch_statements_threaded(batches, n_batches, mode, n_workers):
+    # Fetch batches in a thread pool, yielding their statements in batch
+    # order. At most n_workers batches are submitted at a time so that
+    # finished batches don't pile up while the caller consumes statements.
+    # Database sessions can't be shared between threads so each worker uses
+    # its own handle which is disposed of once all batches are done.
+    thread_data = threading.local()
+    thread_dbs = []
+    thread_dbs_lock = threading.Lock()
+
+    def get_batch_statements(pmid_batch):
+        if not hasattr(thread_data, 'db'):
+            thread_data.db = get_db('primary')
+            if thread_data.db is None:
+                raise ValueError('Could not connect to the primary INDRA '
+                                 'database.')
+            with thread_dbs_lock:
+                thread_dbs.append(thread_data.db)
+        return _get_batch_statements(thread_data.db, pmid_batch, mode)
+
+    try:
+        with ThreadPoolExecutor(max_workers=n_workers) as executor, \
+                tqdm.tqdm(total=n_batches, mininterval=1) as pbar:
+            futures = deque()
+            for pmid_batch in batches:
+                futures.append(executor.submit(get_batch_statements,
+                                               pmid_batch))
+                if len(futures) < n_workers:
+                    continue
+                yield from futures.popleft().result()
+                pbar.update()
+            while futures:
+                yield from futures.popleft().result()
+                pbar.update()
+    finally:
+        for db in thread_dbs:
+            _dispose_db(db)
+
+
+def _dispose_db(db):
+    # Close the session and the connection pool of a database handle
+    session = getattr(db, 'session', None)
+    if session is not None:
+        session.close()
+    engine = getattr(db, 'engine', None)
+    if engine is not None:
+        engine.dispose()
+
+
+def _get_batch_statements(db, pmid_batch, mode):
+    # Return a list of (pmid, statement) tuples for one batch of PMIDs
+    pmid_stmts = []
+    if mode == 'distilled':
+        clauses = [
+            db.TextRef.pmid.in_(pmid_batch),
+            db.TextContent.text_ref_id == db.TextRef.id,
+            db.Reading.text_content_id == db.TextContent.id,
+            db.RawStatements.reading_id == db.Reading.id]
+        distilled_stmts = distill_stmts(db, get_full_stmts=True,
+                                        clauses=clauses)
+        pmid_stmts.extend((stmt.evidence[0].pmid, stmt)
+                          for stmt in distilled_stmts)
+    else:
+        id_stmts = \
+            get_raw_stmt_jsons_from_papers(pmid_batch, id_type='pmid',
+                                           db=db)
+        for pmid, stmt_jsons in id_stmts.items():
+            pmid_stmts.extend((pmid, stmt)
+                              for stmt in stmts_from_json(stmt_jsons))
+    return pmid_stmts
+
+
+@lru_cache(maxsize=32)
+def _load_template_config(model_name):
+    # Several priors are often started from the same template model, so its
+    # config is only downloaded once
+    from emmaa.model import load_config_from_s3
+    return load_config_from_s3(model_name)
+
+
 def make_search_terms(search_strings, mesh_ids):
     """Return EMMAA SearchTerms based on search strings and MeSH IDs.
 
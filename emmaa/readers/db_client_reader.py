@@ -1,3 +1,4 @@
+import logging
 import datetime
 from indra_db.client.principal.raw_statements import \
     get_raw_stmt_jsons_from_papers
@@ -6,7 +7,45 @@ from indra.statements import stmts_from_json
 from emmaa.statements import to_emmaa_stmts
 
 
-def read_db_ids_search_terms(id_search_terms, id_type):
+logger = logging.getLogger(__name__)
+
+_primary_db = None
+
+
+def get_primary_db():
+    """Return a handle to the primary INDRA database.
+
+    The handle is created on first use and shared by subsequent calls so
+    that its engine and connection pool are reused across queries. If the
+    database could not be reached (get_db returned None), nothing is stored
+    and the next call tries again.
+    """
+    global _primary_db
+    if _primary_db is None:
+        _primary_db = get_db('primary')
+    return _primary_db
+
+
+def reset_primary_db():
+    """Roll back and drop the shared primary database handle.
+
+    This is called when a query with the shared handle failed so that its
+    session is not left in a failed transaction, and the next call to
+    get_primary_db makes a new handle.
+    """
+    global _primary_db
+    db, _primary_db = _primary_db, None
+    session = getattr(db, 'session', None)
+    if session is not None:
+        try:
+            session.rollback()
+        # The connection itself may be broken, the handle is dropped anyway
+        except Exception as e:
+            logger.info('Could not roll back the primary database session')
+            logger.info(e)
+
+
+def read_db_ids_search_terms(id_search_terms, id_type, db=None):
     """Return extracted EmmaaStatements from INDRA database given an
     ID-search term dict.
 
@@ -15,6 +54,11 @@ def read_db_ids_search_terms(id_search_terms, id_type):
     id_search_terms : dict
         A dict representing a set of IDs pointing to search terms that
         produced them.
+    id_type : str
+        The type of the IDs, e.g. pmid or doi.
+    db : Optional[indra_db.DatabaseManager]
+        A handle to the INDRA database. If not given, the shared handle to
+        the primary database is used.
 
     Returns
     -------
@@ -23,8 +67,16 @@ def read_db_ids_search_terms(id_search_terms, id_type):
     """
     ids = list(id_search_terms.keys())
     date = datetime.datetime.utcnow()
-    db = get_db('primary')
-    id_stmts = get_raw_stmt_jsons_from_papers(ids, id_type=id_type, db=db)
+    shared_db = db is None
+    if shared_db:
+        db = get_primary_db()
+    try:
+        id_stmts = get_raw_stmt_jsons_from_papers(ids, id_type=id_type,
+                                                  db=db)
+    except Exception:
+        if shared_db:
+            reset_primary_db()
+        raise
     estmts = []
     for _id, stmt_jsons in id_stmts.items():
         stmts = stmts_from_json(stmt_jsons)
@@ -19,6 +19,10 @@ class EmmaaStatement(object):
     metadata : dict
         Additional metadata for the statement.
     """
+    # Models can hold millions of EMMAA Statements so instances don't get
+    # their own attribute dict
+    __slots__ = ('stmt', 'date', 'search_terms', 'metadata')
+
     def __init__(self, stmt, date, search_terms, metadata=None):
         ann = emmaa_metadata_json(search_terms, date, metadata)
         add_emmaa_annotations(stmt, ann)
@@ -27,6 +31,20 @@ class EmmaaStatement(object):
         self.search_terms = search_terms
         self.metadata = metadata if metadata else {}
 
+    def __getstate__(self):
+        # Pickle the attributes as a dict, in the same format as before slots
+        # were used, so that pickles stay compatible in both directions.
+        # Attributes that were never set (e.g. on an instance restored from
+        # an old pickle) are left out, same as in an instance dict.
+        return {attr: getattr(self, attr) for attr in self.__slots__
+                if hasattr(self, attr)}
+
+    def __setstate__(self, state):
+        # Statements pickled before metadata was added don't have it
+        state.setdefault('metadata', {})
+        for attr, value in state.items():
+            setattr(self, attr, value)
+
     def __repr__(self):
         return '%s(%s, %s, %s)' % (self.__class__.__name__, self.stmt,
                                    self.date, self.search_terms)
@@ -11,6 +11,11 @@ from emmaa.model import load_config_from_s3, get_model_stats
 
 logger = logging.getLogger(__name__)
 indra_bio_ARN = os.environ.get('INDRA_BIO_ARN')
+# example:
+# https://emmaa.indra.bio/query/aml?model_type=pysb&query_hash
+# =4911955502409811&order=1
+DETAILED_PAGE_LINK = ('https://{domain}/query/{model_name}?model_type='
+                      '{model_type}&query_hash={query_hash}&order=1')
 
 
 class EmailHtmlBody(object):
@@ -157,50 +162,48 @@ def make_reports_from_results(new_results, domain='emmaa.indra.bio'):
     reports : list
         A list of reports on changes for each of the queries.
     """
-    processed_query_mc = []
+    processed_query_mc = set()
+    # The same query is reported for each mc_type so we only assemble its
+    # English description once
+    english_by_hash = {}
     static_reports = []
     open_reports = []
     dynamic_reports = []
     for model_name, query, mc_type, result_json, delta, _ in new_results:
-        if (model_name, query, mc_type) in processed_query_mc:
+        query_hash = query.get_hash_with_model(model_name)
+        if (query_hash, mc_type) in processed_query_mc:
             continue
         if delta:
             model_type_name = FORMATTED_TYPE_NAMES[
                 mc_type] if mc_type else mc_type
+            if query_hash not in english_by_hash:
+                english_by_hash[query_hash] = query.to_english()
             rep = [
-                query.to_english(),
-                _detailed_page_link(
-                    domain,
-                    model_name,
-                    mc_type,
-                    query.get_hash_with_model(
-                        model_name)),
+                english_by_hash[query_hash],
+                DETAILED_PAGE_LINK.format(
+                    domain=domain,
+                    model_name=model_name,
+                    model_type=mc_type,
+                    query_hash=query_hash),
                 model_name,
                 model_type_name
             ]
+            query_type = query.get_type()
             # static
-            if query.get_type() == 'path_property':
+            if query_type == 'path_property':
                 static_reports.append(rep)
             # open
-            elif query.get_type() == 'open_search_query':
+            elif query_type == 'open_search_query':
                 open_reports.append(rep)
             # dynamic
             else:
                 # Remove link for dynamic
                 _ = rep.pop(1)
                 dynamic_reports.append(rep)
-        processed_query_mc.append((model_name, query, mc_type))
+        processed_query_mc.add((query_hash, mc_type))
     return static_reports, open_reports, dynamic_reports
 
 
-def _detailed_page_link(domain, model_name, model_type, query_hash):
-    # example:
-    # https://emmaa.indra.bio/query/aml/?model_type=pysb&query_hash
-    # =4911955502409811&order=1
-    return f'https://{domain}/query/{model_name}?model_type=' \
-           f'{model_type}&query_hash={query_hash}&order=1'
-
-
 def make_str_report_per_user(static_results_delta, open_results_delta,
                              dynamic_results_delta):
     """Produce a report for all query results per user as a string.
@@ -227,20 +230,20 @@ def make_str_report_per_user(static_results_delta, open_results_delta,
             dynamic_results_delta:
         logger.info('No delta provided')
         return None
-    msg = ''
+    parts = []
     if static_results_delta:
-        msg += 'Updates to your static queries:\n'
+        parts.append('Updates to your static queries:\n')
         for english_query, _, model, mc_type in static_results_delta:
-            msg += f'{english_query} in {model} using the {mc_type}.\n'
+            parts.append(f'{english_query} in {model} using the {mc_type}.\n')
     if open_results_delta:
-        msg += 'Updates to your open queries:\n'
+        parts.append('Updates to your open queries:\n')
         for english_query, _, model, mc_type in open_results_delta:
-            msg += f'{english_query} in {model} using the {mc_type}.\n'
+            parts.append(f'{english_query} in {model} using the {mc_type}.\n')
     if dynamic_results_delta:
-        msg += 'Updates to your dynamic queries:\n'
+        parts.append('Updates to your dynamic queries:\n')
         for english_query, model, mc_type in dynamic_results_delta:
-            msg += f'{english_query} in {model} using the {mc_type}.\n'
-    return msg
+            parts.append(f'{english_query} in {model} using the {mc_type}.\n')
+    return ''.join(parts)
 
 
 def make_html_report_per_user(static_results_delta, open_results_delta,
@@ -214,6 +214,24 @@ def test_get_all_result_hashes_and_delta():
     assert results[0][4] == [], results[0]
 
 
+@with_setup(setup_function, teardown_function)
+@attr('nonpublic')
+def test_get_all_result_hashes_for_queries():
+    db = _get_test_db()
+    db.put_queries('test@test.com', 1, test_queries[0], ['aml'])
+    db.put_queries('test@test.com', 1, test_queries[1], ['aml'])
+    qh0 = test_queries[0].get_hash_with_model('aml')
+    qh1 = test_queries[1].get_hash_with_model('aml')
+    assert db.get_all_result_hashes_for_queries([qh0, qh1]) == {}
+    db.put_results('aml', [(test_queries[0], 'pysb', {'1234': 'result'}),
+                           (test_queries[1], 'pysb', {'345': 'other'})])
+    time.sleep(1)
+    db.put_results('aml', [(test_queries[0], 'pysb', {'567': 'result'})])
+    all_hashes = db.get_all_result_hashes_for_queries([qh0, qh1])
+    assert all_hashes == {(qh0, 'pysb'): {'1234', '567'},
+                          (qh1, 'pysb'): {'345'}}, all_hashes
+
+
 @with_setup(setup_function, teardown_function)
 @attr('nonpublic')
 def test_model_subscription():
@@ -22,3 +22,60 @@ def test_read_db_pmid_search_terms():
     assert len(estmts) > 0
     assert isinstance(estmts[0], EmmaaStatement)
     estmts[0].search_terms == search_terms
+
+
+class _FakeSession(object):
+    def __init__(self):
+        self.rolled_back = False
+
+    def rollback(self):
+        self.rolled_back = True
+
+
+class _FakeDb(object):
+    def __init__(self):
+        self.session = _FakeSession()
+
+
+def test_primary_db_cached_and_reset():
+    from emmaa.readers import db_client_reader
+    handles = [None, _FakeDb(), _FakeDb()]
+    get_db, get_stmts = db_client_reader.get_db, \
+        db_client_reader.get_raw_stmt_jsons_from_papers
+
+    def get_failing_stmts(ids, id_type, db):
+        raise ValueError('Query failed')
+
+    db_client_reader.get_db = lambda name: handles.pop(0)
+    db_client_reader.get_raw_stmt_jsons_from_papers = get_failing_stmts
+    db_client_reader.reset_primary_db()
+    try:
+        # A missing handle is not cached
+        assert db_client_reader.get_primary_db() is None
+        db = db_client_reader.get_primary_db()
+        assert isinstance(db, _FakeDb)
+        assert db_client_reader.get_primary_db() is db
+        # A failed query rolls back and drops the shared handle
+        try:
+            db_client_reader.read_db_ids_search_terms({'1234': []}, 'pmid')
+            assert False, 'Expected ValueError'
+        except ValueError:
+            pass
+        assert db.session.rolled_back
+        new_db = db_client_reader.get_primary_db()
+        assert new_db is not db
+        assert not new_db.session.rolled_back
+        # A handle given by the caller is left alone
+        other_db = _FakeDb()
+        try:
+            db_client_reader.read_db_ids_search_terms({'1234': []}, 'pmid',
+                                                      db=other_db)
+            assert False, 'Expected ValueError'
+        except ValueError:
+            pass
+        assert not other_db.session.rolled_back
+        assert db_client_reader.get_primary_db() is new_db
+    finally:
+        db_client_reader.get_db = get_db
+        db_client_reader.get_raw_stmt_jsons_from_papers = get_stmts
+        db_client_reader.reset_primary_db()
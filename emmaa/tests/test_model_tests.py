@@ -180,3 +180,108 @@ def test_results_json():
                 assert len(path_dict['edges'][1]['hashes']) == 6
                 assert path_dict['edges'][2]['type'] == 'RefEdge'
                 assert 'hashes' not in path_dict['edges'][2]
+
+
+def test_flatten_result():
+    import jsonpickle
+    from indra.explanation.model_checker import PathMetric
+    from emmaa.model_tests import _flatten_result
+    model = create_model()
+    tests = [StatementCheckingTest(
+             Activation(Agent('BRAF', db_refs={'HGNC': '1097'}),
+                        Agent('MAPK1', db_refs={'UP': 'P28482'})))]
+    mm = ModelManager(model)
+    tm = TestManager([mm], tests)
+    tm.make_tests(ScopeTestConnector())
+    tm.run_tests()
+    # Results of all model types are flattened the same way as by jsonpickle
+    for mc_type in mm.mc_types:
+        for result in mm.mc_types[mc_type]['test_results']:
+            assert _flatten_result(result, jsonpickle.pickler.Pickler()) == \
+                jsonpickle.pickler.Pickler().flatten(result), mc_type
+    # A result with distinct sub-objects
+    result = PathResult(True, 'PATHS_FOUND', 5, 2)
+    result.path_metrics = [PathMetric('BRAF', 'MAPK1', 2),
+                           PathMetric('BRAF', 'MAPK1', 2)]
+    result.paths = [(('BRAF', 0), ('MAP2K1', 0), ('MAPK1', 0))]
+    pickler = jsonpickle.pickler.Pickler()
+    assert _flatten_result(result, pickler) == \
+        jsonpickle.pickler.Pickler().flatten(result)
+    # A shared sub-object is written out again instead of as a py/id
+    # reference but both decode to the same values
+    metric = PathMetric('BRAF', 'MAPK1', 2)
+    result.path_metrics = [metric, metric]
+    flat = _flatten_result(result, pickler)
+    jp_flat = jsonpickle.pickler.Pickler().flatten(result)
+    assert flat['path_metrics'][1] == flat['path_metrics'][0]
+    assert 'py/id' in jp_flat['path_metrics'][1]
+    restored = jsonpickle.unpickler.Unpickler().restore(flat)
+    jp_restored = jsonpickle.unpickler.Unpickler().restore(jp_flat)
+    assert [pm.__dict__ for pm in restored.path_metrics] == \
+        [pm.__dict__ for pm in jp_restored.path_metrics]
+    assert restored.paths == jp_restored.paths == result.paths
+
+
+def test_run_all_tests_parallel():
+    import jsonpickle
+    model = create_model()
+    tests = [StatementCheckingTest(
+                Activation(Agent('BRAF', db_refs={'HGNC': '1097'}),
+                           Agent('MAPK1', db_refs={'UP': 'P28482'}))),
+             StatementCheckingTest(
+                Activation(Agent('BRAF', db_refs={'HGNC': '1097'}),
+                           Agent('MAP2K1', db_refs={'HGNC': '6840'})))]
+    mm = ModelManager(model)
+    tm = TestManager([mm], tests)
+    tm.make_tests(ScopeTestConnector())
+    mm.run_all_tests(parallel=True)
+    parallel_results = {
+        mc_type: jsonpickle.encode(mm.mc_types[mc_type]['test_results'])
+        for mc_type in mm.mc_types}
+    parallel_json, parallel_lines = mm.results_to_json()
+    for mc_type in mm.mc_types:
+        mm.mc_types[mc_type]['test_results'] = []
+    mm.run_all_tests(parallel=False)
+    for mc_type in mm.mc_types:
+        assert len(mm.mc_types[mc_type]['test_results']) == 2
+        assert jsonpickle.encode(mm.mc_types[mc_type]['test_results']) == \
+            parallel_results[mc_type], mc_type
+    # Reported paths and their hashes are the same as well
+    serial_json, serial_lines = mm.results_to_json()
+    assert serial_json == parallel_json
+    assert serial_lines == parallel_lines
+
+
+def test_fnv1a_32():
+    from emmaa.model_tests import fnv1a_32
+    # Values from fnvhash.fnv1a_32 which was used to hash results before
+    assert fnv1a_32(b'') == 2166136261
+    assert fnv1a_32(b'a') == 3826002220
+    assert fnv1a_32(b'foobar') == 3214735720
+    assert fnv1a_32('é'.encode('utf-8')) == 513665217
+    assert fnv1a_32('BRAF → MAPK1'.encode('utf-8')) == 1378556090
+
+
+def test_hashed_path_json():
+    model = create_model()
+    model.run_assembly()
+    # Add a statement to have more than one sentence in an edge
+    map2k1 = model.assembled_stmts[1].subj
+    mapk1 = model.assembled_stmts[1].obj
+    model.assembled_stmts.append(Phosphorylation(map2k1, mapk1))
+    mm = ModelManager(model)
+    tests = [StatementCheckingTest(
+             Activation(Agent('BRAF', db_refs={'HGNC': '1097'}),
+                        Agent('MAPK1', db_refs={'UP': 'P28482'})))]
+    tm = TestManager([mm], tests)
+    tm.make_tests(ScopeTestConnector())
+    tm.run_tests()
+    for mc_type in mm.mc_types:
+        result = mm.mc_types[mc_type]['test_results'][0]
+        assert result.paths, mc_type
+        path_json, json_lines = mm.make_path_json(mc_type, result.paths)
+        hashed_json, hashed_lines = mm.make_path_json(
+            mc_type, result.paths, hashed=True)
+        assert hashed_json
+        assert hashed_json == mm.hash_response_list(path_json), mc_type
+        assert hashed_lines == json_lines
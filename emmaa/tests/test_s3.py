@@ -1,7 +1,10 @@
+import os
 import json
 import pickle
 import re
 import time
+import shutil
+import tempfile
 from moto import mock_s3
 from nose.plugins.attrib import attr
 from nose.tools import with_setup
@@ -16,6 +19,24 @@ from emmaa.tests.db_setup import _get_test_db, setup_function, \
     teardown_function
 
 TEST_BUCKET_NAME = 'test_bucket'
+_cache_dir_env = {}
+
+
+def setup_cache_dir():
+    """Point the local S3 cache at a fresh temporary directory."""
+    _cache_dir_env['previous'] = os.environ.get('EMMAA_CACHE_DIR')
+    _cache_dir_env['current'] = tempfile.mkdtemp()
+    os.environ['EMMAA_CACHE_DIR'] = _cache_dir_env['current']
+
+
+def teardown_cache_dir():
+    """Remove the temporary cache directory and restore the environment."""
+    shutil.rmtree(_cache_dir_env.pop('current'), ignore_errors=True)
+    previous = _cache_dir_env.pop('previous')
+    if previous is None:
+        os.environ.pop('EMMAA_CACHE_DIR', None)
+    else:
+        os.environ['EMMAA_CACHE_DIR'] = previous
 
 
 @mock_s3
@@ -297,6 +318,7 @@ def test_model_to_tests():
 
 
 @attr('notravis', 'nonpublic')
+@with_setup(setup_cache_dir, teardown_cache_dir)
 @mock_s3
 def test_generate_stats_on_s3():
     # Local imports are recommended when using moto
@@ -384,3 +406,112 @@ def test_util_find_on_s3_functions():
         TEST_BUCKET_NAME, 'results/test/results_') == 1
     assert find_number_of_files_on_s3(
         TEST_BUCKET_NAME, 'results/test/', '.json') == 1
+
+
+@with_setup(setup_cache_dir, teardown_cache_dir)
+@mock_s3
+def test_load_json_from_s3_cached():
+    # Local imports are recommended when using moto
+    from pathlib import Path
+    from emmaa.util import load_json_from_s3_cached, save_json_to_s3
+    setup_bucket()
+    cache_dir = Path(os.environ['EMMAA_CACHE_DIR'])
+    key = 'stats/test/cached_stats.json'
+    save_json_to_s3(previous_test_stats, TEST_BUCKET_NAME, key)
+    assert load_json_from_s3_cached(TEST_BUCKET_NAME, key) == \
+        previous_test_stats
+    assert len(list(cache_dir.iterdir())) == 1
+    # Loading again uses the cached file
+    assert load_json_from_s3_cached(TEST_BUCKET_NAME, key) == \
+        previous_test_stats
+    assert len(list(cache_dir.iterdir())) == 1
+    # Changed object on S3 has a new ETag and is downloaded again
+    save_json_to_s3({'changed': True}, TEST_BUCKET_NAME, key)
+    assert load_json_from_s3_cached(TEST_BUCKET_NAME, key) == \
+        {'changed': True}
+    assert len(list(cache_dir.iterdir())) == 2
+    # Only the most recently used files are kept
+    os.environ['EMMAA_CACHE_MAX_FILES'] = '1'
+    try:
+        save_json_to_s3({'changed': False}, TEST_BUCKET_NAME, key)
+        assert load_json_from_s3_cached(TEST_BUCKET_NAME, key) == \
+            {'changed': False}
+        assert len(list(cache_dir.iterdir())) == 1
+    finally:
+        os.environ.pop('EMMAA_CACHE_MAX_FILES')
+    # Without a cache directory nothing is stored locally
+    os.environ.pop('EMMAA_CACHE_DIR')
+    shutil.rmtree(cache_dir)
+    assert load_json_from_s3_cached(TEST_BUCKET_NAME, key) == \
+        {'changed': False}
+    assert not cache_dir.exists()
+
+
+@with_setup(setup_cache_dir, teardown_cache_dir)
+@mock_s3
+def test_load_json_from_s3_cached_overwritten():
+    # Local imports are recommended when using moto
+    from pathlib import Path
+    from emmaa import util
+    from emmaa.util import load_json_from_s3_cached, save_json_to_s3
+    client = setup_bucket()
+    cache_dir = Path(os.environ['EMMAA_CACHE_DIR'])
+    key = 'stats/test/cached_stats.json'
+    save_json_to_s3(previous_test_stats, TEST_BUCKET_NAME, key)
+    old_etag = client.head_object(
+        Bucket=TEST_BUCKET_NAME, Key=key)['ETag'].strip('"')
+
+    # Overwrite the object between the head and the get requests
+    class OverwritingClient(object):
+        def head_object(self, **kwargs):
+            return client.head_object(**kwargs)
+
+        def get_object(self, **kwargs):
+            client.put_object(Body=json.dumps({'changed': True}),
+                              Bucket=TEST_BUCKET_NAME, Key=key)
+            return client.get_object(**kwargs)
+
+    get_s3_client = util.get_s3_client
+    util.get_s3_client = lambda unsigned=True: OverwritingClient()
+    try:
+        assert load_json_from_s3_cached(TEST_BUCKET_NAME, key) == \
+            {'changed': True}
+    finally:
+        util.get_s3_client = get_s3_client
+    # The new content is not stored under the ETag of the old object
+    assert not cache_dir.joinpath(f'{old_etag}.json').exists()
+    assert load_json_from_s3_cached(TEST_BUCKET_NAME, key) == \
+        {'changed': True}
+
+
+@mock_s3
+def test_save_load_compressed_json():
+    # Local imports are recommended when using moto
+    from emmaa.util import load_json_from_s3, save_json_to_s3
+    client = setup_bucket()
+    key = 'stats/test/compressed_stats.json'
+    save_json_to_s3(previous_test_stats, TEST_BUCKET_NAME, key, compress=True)
+    obj = client.get_object(Bucket=TEST_BUCKET_NAME, Key=key)
+    assert 'gzip' in obj['ContentEncoding']
+    assert obj['ContentType'] == 'application/json'
+    assert load_json_from_s3(TEST_BUCKET_NAME, key) == previous_test_stats
+    # JSON lines are stored with their own content type
+    key = 'stats/test/compressed_stats.jsonl'
+    save_json_to_s3([previous_test_stats], TEST_BUCKET_NAME, key, 'jsonl',
+                    compress=True)
+    obj = client.get_object(Bucket=TEST_BUCKET_NAME, Key=key)
+    assert 'gzip' in obj['ContentEncoding']
+    assert obj['ContentType'] == 'application/x-ndjson'
+
+
+@mock_s3
+def test_save_load_compressed_pickle():
+    # Local imports are recommended when using moto
+    from emmaa.util import load_pickle_from_s3, save_pickle_to_s3
+    client = setup_bucket()
+    key = 'results/test/model_manager_compressed.pkl'
+    save_pickle_to_s3(previous_test_stats, TEST_BUCKET_NAME, key,
+                      compress=True)
+    obj = client.get_object(Bucket=TEST_BUCKET_NAME, Key=key)
+    assert 'gzip' in obj['ContentEncoding']
+    assert load_pickle_from_s3(TEST_BUCKET_NAME, key) == previous_test_stats
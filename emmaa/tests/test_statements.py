@@ -1,4 +1,6 @@
+import copyreg
 import datetime
+import pickle
 from copy import deepcopy
 
 from emmaa.statements import EmmaaStatement, to_emmaa_stmts, \
@@ -95,3 +97,33 @@ def test_filter_indra_stmts():
     assert stmt8 not in filtered_all
     # Mixed is filtered too here
     assert stmt5 not in filtered_all
+
+
+class _OldEmmaaStatementPickle(object):
+    # Pickles the same way as an EmmaaStatement from before slots and
+    # metadata were added, i.e. as an instance dict without metadata
+    def __init__(self, state):
+        self.state = state
+
+    def __reduce__(self):
+        return (copyreg._reconstructor, (EmmaaStatement, object, None),
+                self.state)
+
+
+def test_pickle_emmaa_stmt():
+    estmt = EmmaaStatement(stmt, date, search_terms, {'internal': True})
+    loaded = pickle.loads(pickle.dumps(estmt))
+    assert loaded.stmt.get_hash() == stmt.get_hash()
+    assert loaded.date == date
+    assert loaded.metadata == {'internal': True}
+    # Old pickles without metadata can be loaded and pickled again
+    old_pickle = pickle.dumps(_OldEmmaaStatementPickle(
+        {'stmt': stmt, 'date': date, 'search_terms': search_terms}))
+    loaded = pickle.loads(old_pickle)
+    assert isinstance(loaded, EmmaaStatement)
+    assert loaded.metadata == {}
+    assert pickle.loads(pickle.dumps(loaded)).metadata == {}
+    # Attributes that were never set are left out
+    empty = EmmaaStatement.__new__(EmmaaStatement)
+    assert empty.__getstate__() == {}
+    assert isinstance(pickle.loads(pickle.dumps(empty)), EmmaaStatement)
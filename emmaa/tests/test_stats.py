@@ -108,6 +108,14 @@ def test_test_round():
     assert len(tr2.find_delta_hashes(tr, 'paths')['added']) == 1
 
 
+def test_test_round_absent_mc_type():
+    tr = TestRound(previous_results, '2020-01-01-00-00-00')
+    # Model types without results have no passed tests
+    assert tr.get_passed_test_hashes('not_a_model_type') == []
+    assert tr.get_number_passed_tests('not_a_model_type') == 0
+    assert tr.passed_over_total('not_a_model_type') == 0
+
+
 @attr('notravis', 'nonpublic')
 def test_model_stats_generator():
     latest_round = ModelRound(new_stmts, '2020-01-02-00-00-00', new_papers)
@@ -188,3 +196,8 @@ def test_test_stats_generator():
     assert changes['signed_graph']['passed_ratio'] == [1, 1]
     assert changes['unsigned_graph']['number_passed_tests'] == [1, 2]
     assert changes['unsigned_graph']['passed_ratio'] == [1, 1]
+    # Previous stats are not modified when making changes over time
+    previous_changes = previous_test_stats['changes_over_time']
+    assert previous_changes['number_applied_tests'] == [1]
+    assert len(previous_changes['dates']) == 1
+    assert previous_changes['pysb']['number_passed_tests'] == [1]
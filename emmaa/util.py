@@ -1,13 +1,18 @@
+import io
 import os
 import re
+import gzip
 import boto3
 import logging
 import json
 import pickle
 import zlib
+import tempfile
 import tweepy
 from flask import Flask
 from pathlib import Path
+from functools import lru_cache
+from itertools import chain
 from datetime import datetime, timedelta
 from botocore import UNSIGNED
 from botocore.client import Config
@@ -22,6 +27,7 @@ FORMAT = '%Y-%m-%d-%H-%M-%S'
 RE_DATETIMEFORMAT = r'\d{4}\-\d{2}\-\d{2}\-\d{2}\-\d{2}\-\d{2}'
 RE_DATEFORMAT = r'\d{4}\-\d{2}\-\d{2}'
 EMMAA_BUCKET_NAME = 'emmaa'
+EMMAA_CACHE_MAX_FILES = 50
 logger = logging.getLogger(__name__)
 
 
@@ -71,13 +77,27 @@ def make_date_str(date=None):
 
 
 def list_s3_files(bucket, prefix, extension=None):
+    return list(_iter_s3_files(bucket, prefix, extension=extension))
+
+
+def _iter_s3_files(bucket, prefix, extension=None):
+    # Iterate over all keys on an S3 path page by page
     client = get_s3_client()
     files = iter_s3_keys(client, bucket, prefix)
     if extension:
-        keys = [f for f in files if f.endswith(extension)]
-    else:
-        keys = list(files)
-    return keys
+        return (f for f in files if f.endswith(extension))
+    return files
+
+
+@lru_cache(maxsize=10000)
+def _get_date_from_key(key):
+    # Parse the date string at the end of the file name of an S3 key. Keys
+    # are listed again and again for the same prefixes, so parsed dates are
+    # cached.
+    fname_with_extension = os.path.basename(key)
+    fname = os.path.splitext(fname_with_extension)[0]
+    date_str = fname.split('_')[-1]
+    return get_date_from_str(date_str)
 
 
 def sort_s3_files_by_date_str(bucket, prefix, extension=None):
@@ -85,15 +105,10 @@ def sort_s3_files_by_date_str(bucket, prefix, extension=None):
     Return the list of keys of the files on an S3 path sorted by date starting
     with the most recent one.
     """
-    def process_key(key):
-        fname_with_extension = os.path.basename(key)
-        fname = os.path.splitext(fname_with_extension)[0]
-        date_str = fname.split('_')[-1]
-        return get_date_from_str(date_str)
     keys = list_s3_files(bucket, prefix, extension=extension)
     if len(keys) < 2:
         return keys
-    keys = sorted(keys, key=lambda k: process_key(k), reverse=True)
+    keys = sorted(keys, key=_get_date_from_key, reverse=True)
     return keys
 
 
@@ -147,12 +162,23 @@ def sort_s3_files_by_last_mod(bucket, prefix, time_delta=None,
 def find_nth_latest_s3_file(n, bucket, prefix, extension=None):
     """Return the key of the file with nth (0-indexed) latest date string on
     an S3 path"""
-    files = sort_s3_files_by_date_str(bucket, prefix, extension)
-    try:
-        latest = files[n]
-        return latest
-    except IndexError:
-        logger.debug('File is not found.')
+    if n == 0:
+        # Only the latest file is needed so the keys are streamed without
+        # being collected and sorted
+        files = _iter_s3_files(bucket, prefix, extension=extension)
+        first, second = next(files, None), next(files, None)
+        # A single file is returned without parsing its date, same as in
+        # sort_s3_files_by_date_str
+        if second is None:
+            if first is not None:
+                return first
+        else:
+            return max(chain((first, second), files), key=_get_date_from_key)
+    else:
+        files = sort_s3_files_by_date_str(bucket, prefix, extension)
+        if len(files) > n:
+            return files[n]
+    logger.debug('File is not found.')
 
 
 def find_latest_s3_file(bucket, prefix, extension=None):
@@ -270,35 +296,171 @@ def load_pickle_from_s3(bucket, key):
     try:
         logger.info(f'Loading object from {key}')
         obj = client.get_object(Bucket=bucket, Key=key)
-        content = pickle.loads(obj['Body'].read())
+        if _is_gzip_encoded(obj):
+            # Unpickle while decompressing the stream
+            with gzip.GzipFile(fileobj=obj['Body']) as fh:
+                content = pickle.load(fh)
+        else:
+            content = pickle.loads(obj['Body'].read())
         return content
     except Exception as e:
         logger.info(f'Could not load the pickle from {key}')
         logger.info(e)
 
 
-def save_pickle_to_s3(obj, bucket, key):
+def save_pickle_to_s3(obj, bucket, key, compress=False):
+    """Pickle an object and save it to S3.
+
+    If compress is True, the pickle is gzip compressed and stored with gzip
+    Content-Encoding under the same key. It is decompressed transparently by
+    load_pickle_from_s3. Compressed pickles are streamed through a spooled
+    temporary file instead of being built as bytes in memory.
+    """
     client = get_s3_client(unsigned=False)
-    logger.info('Pickling object')
-    obj_str = pickle.dumps(obj, protocol=4)
-    logger.info(f'Saving object to {key}')
-    client.put_object(Body=obj_str, Bucket=bucket, Key=key)
+    if compress:
+        with tempfile.SpooledTemporaryFile(max_size=64 << 20) as buf:
+            logger.info('Pickling object')
+            with gzip.GzipFile(fileobj=buf, mode='wb', compresslevel=6) as gz:
+                pickle.dump(obj, gz, protocol=4)
+            buf.seek(0)
+            logger.info(f'Saving object to {key}')
+            client.upload_fileobj(buf, bucket, key,
+                                  ExtraArgs={'ContentEncoding': 'gzip'})
+    else:
+        logger.info('Pickling object')
+        obj_str = pickle.dumps(obj, protocol=4)
+        logger.info(f'Saving object to {key}')
+        client.put_object(Body=obj_str, Bucket=bucket, Key=key)
 
 
 def load_json_from_s3(bucket, key):
     client = get_s3_client()
     logger.info(f'Loading object from {key}')
     obj = client.get_object(Bucket=bucket, Key=key)
-    content = json.loads(obj['Body'].read().decode('utf8'))
+    # json can parse the UTF-8 bytes directly without building a str first
+    content = json.loads(_read_s3_body(obj))
     return content
 
 
-def save_json_to_s3(obj, bucket, key, save_format='json'):
+def _get_cache_dir():
+    """Return the local S3 cache directory or None if caching is disabled.
+
+    Caching is opt-in: it is only enabled when the EMMAA_CACHE_DIR
+    environment variable is set. The variable is read at call time so that
+    it can be changed after emmaa.util is imported.
+    """
+    cache_dir = os.environ.get('EMMAA_CACHE_DIR')
+    if not cache_dir:
+        return None
+    return Path(cache_dir)
+
+
+def _evict_cache_files(cache_dir, keep):
+    """Remove all but the keep most recently used files from the cache."""
+    cache_files = sorted(cache_dir.glob('*.json'),
+                         key=lambda path: path.stat().st_mtime_ns,
+                         reverse=True)
+    for path in cache_files[max(keep, 0):]:
+        path.unlink()
+
+
+def load_json_from_s3_cached(bucket, key):
+    """Load a JSON object from S3 reusing a local copy when possible.
+
+    The local copy is stored under the directory given by the EMMAA_CACHE_DIR
+    environment variable and named by the ETag of the S3 object so that a
+    changed object on S3 is downloaded again. At most EMMAA_CACHE_MAX_FILES
+    files (overridden by the environment variable of the same name) are
+    kept, the least recently used ones are removed first. If EMMAA_CACHE_DIR
+    is not set, this is the same as load_json_from_s3.
+    """
+    cache_dir = _get_cache_dir()
+    if cache_dir is None:
+        return load_json_from_s3(bucket, key)
+    client = get_s3_client()
+    etag = client.head_object(Bucket=bucket, Key=key)['ETag'].strip('"')
+    cache_path = cache_dir.joinpath(f'{etag}.json')
+    if cache_path.exists():
+        logger.info(f'Loading object from {key} from local cache')
+        with open(cache_path, 'rb') as fh:
+            content = json.load(fh)
+        # Mark the file as recently used so it is evicted last
+        try:
+            cache_path.touch()
+        except OSError:
+            pass
+        return content
+    logger.info(f'Loading object from {key}')
+    obj = client.get_object(Bucket=bucket, Key=key)
+    body = _read_s3_body(obj)
+    # The object could have changed since the head request, so the file is
+    # named by the ETag of the body that was actually downloaded
+    etag = obj['ETag'].strip('"')
+    cache_path = cache_dir.joinpath(f'{etag}.json')
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        max_files = int(os.environ.get('EMMAA_CACHE_MAX_FILES',
+                                       EMMAA_CACHE_MAX_FILES))
+        # Make room for the new file before writing it
+        _evict_cache_files(cache_dir, max_files - 1)
+        # Write to a temporary file first so that a partially written file
+        # is never loaded from the cache
+        tmp_path = cache_path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as fh:
+            fh.write(body)
+        os.replace(tmp_path, cache_path)
+    # Caching is optional, e.g. the file system may be read-only
+    except OSError as e:
+        logger.info(f'Could not cache {key} locally')
+        logger.info(e)
+    content = json.loads(body)
+    return content
+
+
+def save_json_to_s3(obj, bucket, key, save_format='json', compress=False):
+    """Save a JSON serializable object to S3.
+
+    If compress is True, the object is gzip compressed and stored with gzip
+    Content-Encoding under the same key. It is decompressed transparently by
+    load_json_from_s3 and by browsers. Compressed objects are written without
+    indentation and streamed through a spooled temporary file instead of
+    being built as a string in memory.
+    """
     client = get_s3_client(unsigned=False)
-    json_str = _get_json_str(obj, save_format=save_format)
-    logger.info(f'Uploading the {save_format} object to S3')
-    client.put_object(Body=json_str.encode('utf8'),
-                      Bucket=bucket, Key=key)
+    if compress:
+        with tempfile.SpooledTemporaryFile(max_size=64 << 20) as buf:
+            logger.info(f'Dumping the {save_format} into a gzip file')
+            with gzip.GzipFile(fileobj=buf, mode='wb', compresslevel=6) as gz,\
+                    io.TextIOWrapper(gz, encoding='utf8') as fh:
+                _dump_json(obj, fh, save_format=save_format)
+            buf.seek(0)
+            logger.info(f'Uploading the {save_format} object to S3')
+            content_type = 'application/x-ndjson' if save_format == 'jsonl' \
+                else 'application/json'
+            client.upload_fileobj(
+                buf, bucket, key,
+                ExtraArgs={'ContentEncoding': 'gzip',
+                           'ContentType': content_type})
+    else:
+        json_str = _get_json_str(obj, save_format=save_format)
+        logger.info(f'Uploading the {save_format} object to S3')
+        client.put_object(Body=json_str.encode('utf8'), Bucket=bucket,
+                          Key=key)
+
+
+def _is_gzip_encoded(obj):
+    # Check if an S3 object was saved with gzip Content-Encoding
+    encodings = obj.get('ContentEncoding', '').split(',')
+    return 'gzip' in [encoding.strip() for encoding in encodings]
+
+
+def _read_s3_body(obj):
+    # Return the bytes of an S3 object decompressing them if the object was
+    # saved with gzip Content-Encoding
+    body = obj['Body'].read()
+    if _is_gzip_encoded(obj):
+        body = gzip.decompress(body)
+    return body
 
 
 def load_gzip_json_from_s3(bucket, key):
@@ -308,7 +470,7 @@ def load_gzip_json_from_s3(bucket, key):
         logger.info(f'Loading zipped object from {key}')
         gz_obj = client.get_object(Bucket=bucket, Key=key)
         content = json.loads(zlib.decompress(
-            gz_obj['Body'].read(), 16+zlib.MAX_WBITS).decode('utf8'))
+            gz_obj['Body'].read(), 16+zlib.MAX_WBITS))
     except Exception as e:
         logger.info(e)
         logger.info('Could not load with gzip, using zipfile')
@@ -336,6 +498,17 @@ def _get_json_str(json_obj, save_format='json'):
     return json_str
 
 
+def _dump_json(json_obj, fh, save_format='json'):
+    # Write the object into an open text file in the given format
+    if save_format == 'json':
+        json.dump(json_obj, fh)
+    elif save_format == 'jsonl':
+        for ix, item in enumerate(json_obj):
+            if ix:
+                fh.write('\n')
+            json.dump(item, fh)
+
+
 class NotAClassName(Exception):
     pass
 